@@ -1,16 +1,20 @@
 """
 BBC Learning English Platform - FastAPI Backend
 """
+import asyncio
 import logging
+import sqlite3
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import ORJSONResponse
 from pathlib import Path
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from backend.config import settings
+from backend.services.db_service import get_db
 from backend.services.hf_dataset import HFDatasetService
 
 # Setup logging
@@ -26,6 +30,9 @@ async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
     # Startup: Download database from HF Dataset
     logger.info("Starting up...")
+    app.state.ready = False
+    app.state.warmup_error = None
+    warmup = None
 
     if settings.hf_dataset_id:
         hf_service = HFDatasetService(
@@ -34,7 +41,7 @@ async def lifespan(app: FastAPI):
         )
 
         logger.info(f"Downloading database from HF Dataset: {settings.hf_dataset_id}")
-        success = hf_service.download_database(settings.db_path)
+        success = await asyncio.to_thread(hf_service.download_database, settings.db_path)
 
         if success:
             logger.info("✓ Database ready")
@@ -50,18 +57,43 @@ async def lifespan(app: FastAPI):
     if not db_file.exists():
         logger.error(f"Database not found at {settings.db_path}!")
         logger.error("Please set HF_DATASET_ID or provide a local database")
+    else:
+        # Warm up SQLite (open file, parse schema, build indexes) while the server starts accepting requests
+        warmup = asyncio.create_task(asyncio.to_thread(get_db().warm_up))
+        warmup.add_done_callback(lambda task: _mark_ready(app, task))
 
     yield
 
     # Shutdown
     logger.info("Shutting down...")
+    if warmup and not warmup.done():
+        warmup.cancel()
+    # Skip the checkpoint if warmup failed or never finished
+    if getattr(app.state, "ready", False):
+        try:
+            await asyncio.to_thread(get_db().checkpoint)
+        except sqlite3.Error as e:
+            logger.error(f"WAL checkpoint on shutdown failed: {e}")
+
+
+def _mark_ready(app: FastAPI, task: asyncio.Task):
+    """Flag the app as ready once the database warmup has finished"""
+    if task.cancelled():
+        return
+    if task.exception():
+        logger.error(f"Database warmup failed: {task.exception()}")
+        app.state.warmup_error = str(task.exception())
+        return
+    app.state.ready = True
+    logger.info("✓ Database warmed up")
 
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -69,8 +101,9 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type", "Authorization"],
+    max_age=86400,  # Let browsers cache preflight responses for a day
 )
 
 # Import routers
@@ -88,6 +121,21 @@ async def health_check():
     """Health check endpoint"""
     db_exists = Path(settings.db_path).exists()
 
+    warmup_error = getattr(app.state, "warmup_error", None)
+    if db_exists and warmup_error:
+        return ORJSONResponse(status_code=503, content={
+            "status": "error",
+            "database": f"warmup failed: {warmup_error}",
+            "version": settings.app_version
+        })
+
+    if db_exists and not getattr(app.state, "ready", False):
+        return ORJSONResponse(status_code=503, content={
+            "status": "starting",
+            "database": "warming up",
+            "version": settings.app_version
+        })
+
     return {
         "status": "ok" if db_exists else "error",
         "database": "ready" if db_exists else "missing",
@@ -95,15 +143,30 @@ async def health_check():
     }
 
 
+class AssetStaticFiles(StaticFiles):
+    """Static files for Vite build assets (content-hashed filenames)"""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
+class SPAStaticFiles(StaticFiles):
+    """Static files with index.html fallback for client-side routes"""
+
+    async def get_response(self, path: str, scope):
+        try:
+            return await super().get_response(path, scope)
+        except StarletteHTTPException as e:
+            if e.status_code != 404:
+                raise
+            return await super().get_response("index.html", scope)
+
+
 # Serve frontend static files (for production / HF Spaces)
+# Mounted last so the /api routes above take precedence
 STATIC_DIR = Path(__file__).parent.parent / "frontend" / "dist"
 if STATIC_DIR.is_dir():
-    app.mount("/assets", StaticFiles(directory=STATIC_DIR / "assets"), name="assets")
-
-    @app.get("/{full_path:path}")
-    async def serve_spa(full_path: str):
-        """Serve React SPA"""
-        file = STATIC_DIR / full_path
-        if file.is_file():
-            return FileResponse(file)
-        return FileResponse(STATIC_DIR / "index.html")
+    app.mount("/assets", AssetStaticFiles(directory=STATIC_DIR / "assets"), name="assets")
+    app.mount("/", SPAStaticFiles(directory=STATIC_DIR, html=True), name="spa")
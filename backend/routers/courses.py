@@ -2,30 +2,54 @@
 Courses API Router
 Handles course structure endpoints (levels, units, sessions, activities)
 """
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
+from functools import lru_cache
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 
 from backend.config import settings
-from backend.services.db_service import DatabaseService
+from backend.services.db_service import DatabaseService, get_db
+
+# Course content only changes when a new database is shipped
+CACHE_CONTROL = "public, max-age=300"
+
+
+@lru_cache(maxsize=1)
+def content_etag() -> str:
+    """ETag for course content, derived from the database file"""
+    stat = Path(settings.db_path).stat()
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def cache_headers(request: Request, response: Response):
+    """Answer conditional GETs with 304 and tag responses with ETag/Cache-Control"""
+    etag = content_etag()
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        raise HTTPException(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+
 
-router = APIRouter()
-db = DatabaseService(settings.db_path)
+router = APIRouter(dependencies=[Depends(cache_headers)])
 
 
-@router.get("/levels", response_model=List[Dict[str, Any]])
-async def get_levels():
+@router.get("/levels", response_model=None)
+def get_levels(db: DatabaseService = Depends(get_db)):
     """Get all course levels"""
     return db.get_levels()
 
 
-@router.get("/levels/{level_id}/units", response_model=List[Dict[str, Any]])
-async def get_units(level_id: str):
+@router.get("/levels/{level_id}/units", response_model=None)
+def get_units(level_id: str, db: DatabaseService = Depends(get_db)):
     """Get all units for a level"""
     return db.get_units(level_id)
 
 
-@router.get("/units/{unit_id}", response_model=Dict[str, Any])
-async def get_unit(unit_id: int):
+@router.get("/units/{unit_id}", response_model=None)
+def get_unit(unit_id: int, db: DatabaseService = Depends(get_db)):
     """Get a single unit"""
     unit = db.get_unit(unit_id)
     if not unit:
@@ -33,14 +57,14 @@ async def get_unit(unit_id: int):
     return unit
 
 
-@router.get("/units/{unit_id}/sessions", response_model=List[Dict[str, Any]])
-async def get_sessions(unit_id: int):
+@router.get("/units/{unit_id}/sessions", response_model=None)
+def get_sessions(unit_id: int, db: DatabaseService = Depends(get_db)):
     """Get all sessions for a unit"""
     return db.get_sessions(unit_id)
 
 
-@router.get("/sessions/{session_id}", response_model=Dict[str, Any]])
-async def get_session(session_id: int):
+@router.get("/sessions/{session_id}", response_model=None)
+def get_session(session_id: int, db: DatabaseService = Depends(get_db)):
     """Get a single session"""
     session = db.get_session(session_id)
     if not session:
@@ -48,14 +72,14 @@ async def get_session(session_id: int):
     return session
 
 
-@router.get("/sessions/{session_id}/activities", response_model=List[Dict[str, Any]])
-async def get_activities(session_id: int):
+@router.get("/sessions/{session_id}/activities", response_model=None)
+def get_activities(session_id: int, db: DatabaseService = Depends(get_db)):
     """Get all activities for a session"""
     return db.get_activities(session_id)
 
 
-@router.get("/activities/{activity_id}", response_model=Dict[str, Any])
-async def get_activity(activity_id: int):
+@router.get("/activities/{activity_id}", response_model=None)
+def get_activity(activity_id: int, db: DatabaseService = Depends(get_db)):
     """Get a single activity with full content"""
     activity = db.get_activity(activity_id)
     if not activity:
@@ -63,7 +87,7 @@ async def get_activity(activity_id: int):
     return activity
 
 
-@router.get("/sessions/{session_id}/vocabulary", response_model=List[Dict[str, Any]])
-async def get_session_vocabulary(session_id: int):
+@router.get("/sessions/{session_id}/vocabulary", response_model=None)
+def get_session_vocabulary(session_id: int, db: DatabaseService = Depends(get_db)):
     """Get vocabulary items for a session"""
     return db.get_session_vocabulary(session_id)
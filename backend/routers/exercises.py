@@ -2,15 +2,13 @@
 Exercises API Router
 Handles PET-style exercise endpoints
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 
-from backend.config import settings
-from backend.services.db_service import DatabaseService
+from backend.services.db_service import DatabaseService, get_db
 
 router = APIRouter()
-db = DatabaseService(settings.db_path)
 
 
 class AnswerRequest(BaseModel):
@@ -18,11 +16,23 @@ class AnswerRequest(BaseModel):
     user_answer: str
 
 
-@router.get("/", response_model=List[Dict[str, Any]])
-async def get_exercises(
+class ExerciseAnswer(BaseModel):
+    """A single answer within a batch"""
+    exercise_id: int
+    user_answer: str
+
+
+class BulkAnswerRequest(BaseModel):
+    """Request model for submitting several answers at once"""
+    answers: List[ExerciseAnswer]
+
+
+@router.get("/", response_model=None)
+def get_exercises(
     session_id: Optional[int] = None,
     exercise_type: Optional[str] = None,
-    limit: int = 10
+    limit: int = 10,
+    db: DatabaseService = Depends(get_db)
 ):
     """Get exercises with optional filters"""
     return db.get_exercises(
@@ -33,7 +43,8 @@ async def get_exercises(
 
 
 @router.post("/{exercise_id}/submit", response_model=Dict[str, Any])
-async def submit_answer(exercise_id: int, answer: AnswerRequest):
+def submit_answer(exercise_id: int, answer: AnswerRequest,
+                  db: DatabaseService = Depends(get_db)):
     """Submit an answer to an exercise"""
     result = db.submit_exercise_answer(exercise_id, answer.user_answer)
 
@@ -41,3 +52,12 @@ async def submit_answer(exercise_id: int, answer: AnswerRequest):
         raise HTTPException(status_code=404, detail=result['error'])
 
     return result
+
+
+@router.post("/submit", response_model=None)
+def submit_answers(request: BulkAnswerRequest,
+                   db: DatabaseService = Depends(get_db)):
+    """Submit a batch of answers in one transaction"""
+    return db.submit_exercise_answers_bulk(
+        [(answer.exercise_id, answer.user_answer) for answer in request.answers]
+    )
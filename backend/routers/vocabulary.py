@@ -2,15 +2,13 @@
 Vocabulary API Router
 Handles flashcard endpoints with SM-2 spaced repetition
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 
-from backend.config import settings
-from backend.services.db_service import DatabaseService
+from backend.services.db_service import DatabaseService, get_db
 
 router = APIRouter()
-db = DatabaseService(settings.db_path)
 
 
 class ReviewRequest(BaseModel):
@@ -18,23 +16,58 @@ class ReviewRequest(BaseModel):
     quality: int  # 0-5
 
 
-@router.get("/flashcards", response_model=List[Dict[str, Any]])
-async def get_flashcards(limit: Optional[int] = 20, difficulty: Optional[str] = None):
+class CardReview(BaseModel):
+    """A single review within a batch"""
+    card_id: int
+    quality: int  # 0-5
+
+
+class BulkReviewRequest(BaseModel):
+    """Request model for reviewing several flashcards at once"""
+    reviews: List[CardReview]
+
+
+@router.get("/flashcards", response_model=None)
+def get_flashcards(limit: Optional[int] = 20, difficulty: Optional[str] = None,
+                   db: DatabaseService = Depends(get_db)):
     """Get flashcards with optional filters"""
     return db.get_flashcards(limit=limit, difficulty=difficulty)
 
 
 @router.get("/flashcards/due", response_model=List[Dict[str, Any]])
-async def get_due_flashcards(limit: int = 20):
+def get_due_flashcards(limit: int = 20, db: DatabaseService = Depends(get_db)):
     """Get flashcards due for review"""
     return db.get_due_flashcards(limit=limit)
 
 
+@router.get("/flashcards/due/count", response_model=Dict[str, int])
+def count_due_flashcards(db: DatabaseService = Depends(get_db)):
+    """Count flashcards due for review"""
+    return {"due": db.count_due_cards()}
+
+
 @router.post("/flashcards/{card_id}/review", response_model=Dict[str, Any])
-async def review_flashcard(card_id: int, review: ReviewRequest):
+def review_flashcard(card_id: int, review: ReviewRequest,
+                    db: DatabaseService = Depends(get_db)):
     """Record a flashcard review"""
     if review.quality < 0 or review.quality > 5:
         raise HTTPException(status_code=400, detail="Quality must be between 0 and 5")
 
     result = db.review_flashcard(card_id, review.quality)
+
+    if 'error' in result:
+        raise HTTPException(status_code=404, detail=result['error'])
+
     return result
+
+
+@router.post("/flashcards/review", response_model=None)
+def review_flashcards(request: BulkReviewRequest,
+                      db: DatabaseService = Depends(get_db)):
+    """Record a batch of flashcard reviews in one transaction"""
+    if any(review.quality < 0 or review.quality > 5 for review in request.reviews):
+        raise HTTPException(status_code=400, detail="Quality must be between 0 and 5")
+
+    return db.review_flashcards_bulk(
+        [(review.card_id, review.quality) for review in request.reviews]
+    )
@@ -3,62 +3,270 @@ Database Service
 Handles all database queries for the API
 """
 import sqlite3
+import threading
+import time
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 
+from backend.config import settings
 from backend.services.sm2 import calculate_next_review
 
+# Applied once to every new connection
+CONNECTION_PRAGMAS = """
+    PRAGMA journal_mode = WAL;
+    PRAGMA synchronous = NORMAL;
+    PRAGMA temp_store = MEMORY;
+    PRAGMA mmap_size = 268435456;
+    PRAGMA cache_size = -65536;
+    PRAGMA foreign_keys = ON;
+    PRAGMA wal_autocheckpoint = 1000;
+"""
+
+# Indexes the API relies on; databases built before they were added to the
+# schema get them on startup
+RUNTIME_INDEXES = """
+    CREATE INDEX IF NOT EXISTS idx_flashcard_progress_next_review ON flashcard_progress(next_review_date);
+    CREATE INDEX IF NOT EXISTS idx_exercise_attempts_correct ON exercise_attempts(is_correct);
+    CREATE INDEX IF NOT EXISTS idx_flashcards_difficulty ON flashcards(difficulty);
+    CREATE INDEX IF NOT EXISTS idx_exercises_type ON exercises(exercise_type);
+"""
+
+# Review timestamps are stored as Unix seconds; convert rows written by older
+# versions, which stored local-time ISO strings
+EPOCH_MIGRATION = """
+    UPDATE flashcard_progress
+    SET next_review_date = CAST(strftime('%s', next_review_date, 'utc') AS INTEGER)
+    WHERE typeof(next_review_date) = 'text';
+    UPDATE flashcard_progress
+    SET last_reviewed_at = CAST(strftime('%s', last_reviewed_at, 'utc') AS INTEGER)
+    WHERE typeof(last_reviewed_at) = 'text';
+"""
+
+# Hot queries live at module level so every call reuses the same SQL text
+# and hits the connection's prepared statement cache
+
+LEVELS_SQL = """
+    SELECT level_id, title, description, total_units
+    FROM levels
+    ORDER BY level_id
+"""
+
+UNITS_SQL = """
+    SELECT unit_id, level_id, unit_number, title, description, url
+    FROM units
+    WHERE level_id = ?
+    ORDER BY unit_number
+"""
+
+UNIT_SQL = """
+    SELECT unit_id, level_id, unit_number, title, description, url
+    FROM units
+    WHERE unit_id = ?
+"""
+
+SESSIONS_SQL = """
+    SELECT session_id, unit_id, session_number, type, title, url,
+           has_audio, audio_url
+    FROM sessions
+    WHERE unit_id = ?
+    ORDER BY session_number
+"""
+
+SESSION_SQL = """
+    SELECT *
+    FROM sessions
+    WHERE session_id = ?
+"""
+
+ACTIVITIES_SQL = """
+    SELECT activity_id, session_id, activity_number, title,
+           instruction, url, has_audio, has_transcript
+    FROM activities
+    WHERE session_id = ?
+    ORDER BY activity_number
+"""
+
+ACTIVITY_SQL = """
+    SELECT *
+    FROM activities
+    WHERE activity_id = ?
+"""
+
+SESSION_VOCABULARY_SQL = """
+    SELECT vocab_id, word, definition, rule, is_example, section_title
+    FROM session_vocabulary
+    WHERE session_id = ?
+    ORDER BY sort_order
+"""
+
+FLASHCARDS_SQL = """
+    SELECT
+        f.card_id, f.word, f.definition_en, f.definition_cn,
+        f.example_en, f.example_cn, f.difficulty,
+        fp.easiness_factor, fp.repetitions, fp.interval,
+        fp.next_review_date, fp.last_reviewed_at
+    FROM flashcards f
+    LEFT JOIN flashcard_progress fp ON f.card_id = fp.card_id
+"""
+
+# New cards first, then reviewed cards by due date; each branch walks its own
+# index and the outer LIMIT stops as soon as enough rows are found
+DUE_FLASHCARDS_SQL = """
+    SELECT * FROM (
+        SELECT
+            f.card_id, f.word, f.definition_en, f.definition_cn,
+            f.example_en, f.example_cn, f.difficulty,
+            fp.easiness_factor, fp.repetitions, fp.interval,
+            fp.next_review_date, fp.last_reviewed_at
+        FROM flashcards f
+        LEFT JOIN flashcard_progress fp ON f.card_id = fp.card_id
+        WHERE fp.next_review_date IS NULL
+        LIMIT ?
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT
+            f.card_id, f.word, f.definition_en, f.definition_cn,
+            f.example_en, f.example_cn, f.difficulty,
+            fp.easiness_factor, fp.repetitions, fp.interval,
+            fp.next_review_date, fp.last_reviewed_at
+        FROM flashcard_progress fp
+        JOIN flashcards f ON f.card_id = fp.card_id
+        WHERE fp.next_review_date <= CAST(strftime('%s', 'now') AS INTEGER)
+        ORDER BY fp.next_review_date ASC
+        LIMIT ?
+    )
+    LIMIT ?
+"""
+
+FLASHCARD_PROGRESS_SQL = """
+    SELECT f.card_id, fp.easiness_factor, fp.repetitions, fp.interval
+    FROM flashcards f
+    LEFT JOIN flashcard_progress fp ON f.card_id = fp.card_id
+    WHERE f.card_id IN ({placeholders})
+"""
+
+DUE_COUNT_SQL = """
+    SELECT COUNT(*) FROM flashcard_progress
+    WHERE next_review_date <= CAST(strftime('%s', 'now') AS INTEGER)
+"""
+
+UPSERT_FLASHCARD_PROGRESS_SQL = """
+    INSERT INTO flashcard_progress
+    (card_id, easiness_factor, repetitions, interval, next_review_date, last_reviewed_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(card_id) DO UPDATE SET
+        easiness_factor = excluded.easiness_factor,
+        repetitions = excluded.repetitions,
+        interval = excluded.interval,
+        next_review_date = excluded.next_review_date,
+        last_reviewed_at = excluded.last_reviewed_at
+"""
+
+EXERCISES_SQL = """
+    SELECT exercise_id, session_id, exercise_type, question,
+           options, correct_answer, explanation, difficulty
+    FROM exercises
+"""
+
+EXERCISE_ANSWER_SQL = """
+    SELECT exercise_id, correct_answer, explanation
+    FROM exercises
+    WHERE exercise_id IN ({placeholders})
+"""
+
+INSERT_EXERCISE_ATTEMPT_SQL = """
+    INSERT INTO exercise_attempts (exercise_id, user_answer, is_correct)
+    VALUES (?, ?, ?)
+"""
+
+PROGRESS_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM user_progress WHERE completed = 1) AS completed_activities,
+        (SELECT COUNT(*) FROM activities) AS total_activities,
+        (SELECT COUNT(*) FROM flashcard_progress) AS reviewed_flashcards,
+        (SELECT COUNT(*) FROM flashcard_progress
+         WHERE next_review_date <= CAST(strftime('%s', 'now') AS INTEGER)) AS due_flashcards,
+        (SELECT COUNT(*) FROM exercise_attempts) AS attempted_exercises,
+        (SELECT COUNT(*) FROM exercise_attempts WHERE is_correct = 1) AS correct_exercises
+"""
+
+MARK_ACTIVITY_COMPLETE_SQL = """
+    INSERT INTO user_progress (activity_id, completed, completed_at)
+    VALUES (?, 1, ?)
+    ON CONFLICT(activity_id) DO UPDATE SET
+        completed = 1,
+        completed_at = excluded.completed_at
+"""
+
 
 class DatabaseService:
     """Service for database operations"""
 
     def __init__(self, db_path: str):
         self.db_path = db_path
+        self._local = threading.local()
+        # Course structure rows by (query, id); see _structure_rows
+        self._structure: Dict[Tuple, List[Dict[str, Any]]] = {}
 
     def get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        """Get this thread's database connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                                   cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            conn.executescript(CONNECTION_PRAGMAS)
+            self._local.conn = conn
         return conn
 
+    def warm_up(self):
+        """Apply runtime indexes and migrations, and touch the schema so the first request is fast"""
+        with self.get_connection() as conn:
+            conn.executescript(RUNTIME_INDEXES)
+            conn.executescript(EPOCH_MIGRATION)
+
+        self._structure.clear()
+        self.get_levels()
+
+    def checkpoint(self):
+        """Fold the WAL back into the database file and truncate it"""
+        with self.get_connection() as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
     # ========== Levels & Units ==========
+    # Course structure never changes at runtime, so the lookups below are
+    # memoized (the service is a process-wide singleton, see get_db)
+
+    def _structure_rows(self, sql: str, params: Tuple = ()) -> List[Dict[str, Any]]:
+        """
+        Run a course structure query, memoized by query and parameters
+        Only non-empty results are kept, so an unknown id is looked up again
+        next time; callers get their own copies of the rows
+        """
+        key = (sql, params)
+        rows = self._structure.get(key)
+        if rows is None:
+            with self.get_connection() as conn:
+                rows = [dict(row) for row in conn.execute(sql, params).fetchall()]
+            if rows:
+                self._structure[key] = rows
+
+        return [dict(row) for row in rows]
 
     def get_levels(self) -> List[Dict[str, Any]]:
         """Get all course levels"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            rows = cursor.execute("""
-                SELECT level_id, title, description, total_units
-                FROM levels
-                ORDER BY level_id
-            """).fetchall()
-
-            return [dict(row) for row in rows]
+        return self._structure_rows(LEVELS_SQL)
 
     def get_units(self, level_id: str) -> List[Dict[str, Any]]:
         """Get all units for a level"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            rows = cursor.execute("""
-                SELECT unit_id, level_id, unit_number, title, description, url
-                FROM units
-                WHERE level_id = ?
-                ORDER BY unit_number
-            """, (level_id,)).fetchall()
-
-            return [dict(row) for row in rows]
+        return self._structure_rows(UNITS_SQL, (level_id,))
 
     def get_unit(self, unit_id: int) -> Optional[Dict[str, Any]]:
         """Get a single unit by ID"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            row = cursor.execute("""
-                SELECT unit_id, level_id, unit_number, title, description, url
-                FROM units
-                WHERE unit_id = ?
-            """, (unit_id,)).fetchone()
-
-            return dict(row) if row else None
+        rows = self._structure_rows(UNIT_SQL, (unit_id,))
+        return rows[0] if rows else None
 
     # ========== Sessions ==========
 
@@ -66,27 +274,14 @@ class DatabaseService:
         """Get all sessions for a unit"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            rows = cursor.execute("""
-                SELECT session_id, unit_id, session_number, type, title, url,
-                       has_audio, audio_url
-                FROM sessions
-                WHERE unit_id = ?
-                ORDER BY session_number
-            """, (unit_id,)).fetchall()
+            rows = cursor.execute(SESSIONS_SQL, (unit_id,)).fetchall()
 
             return [dict(row) for row in rows]
 
     def get_session(self, session_id: int) -> Optional[Dict[str, Any]]:
         """Get a single session by ID"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            row = cursor.execute("""
-                SELECT *
-                FROM sessions
-                WHERE session_id = ?
-            """, (session_id,)).fetchone()
-
-            return dict(row) if row else None
+        rows = self._structure_rows(SESSION_SQL, (session_id,))
+        return rows[0] if rows else None
 
     # ========== Activities ==========
 
@@ -94,13 +289,7 @@ class DatabaseService:
         """Get all activities for a session"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            rows = cursor.execute("""
-                SELECT activity_id, session_id, activity_number, title,
-                       instruction, url, has_audio, has_transcript
-                FROM activities
-                WHERE session_id = ?
-                ORDER BY activity_number
-            """, (session_id,)).fetchall()
+            rows = cursor.execute(ACTIVITIES_SQL, (session_id,)).fetchall()
 
             return [dict(row) for row in rows]
 
@@ -108,11 +297,7 @@ class DatabaseService:
         """Get a single activity by ID with full content"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            row = cursor.execute("""
-                SELECT *
-                FROM activities
-                WHERE activity_id = ?
-            """, (activity_id,)).fetchone()
+            row = cursor.execute(ACTIVITY_SQL, (activity_id,)).fetchone()
 
             return dict(row) if row else None
 
@@ -122,12 +307,7 @@ class DatabaseService:
         """Get vocabulary items for a session"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            rows = cursor.execute("""
-                SELECT vocab_id, word, definition, rule, is_example, section_title
-                FROM session_vocabulary
-                WHERE session_id = ?
-                ORDER BY sort_order
-            """, (session_id,)).fetchall()
+            rows = cursor.execute(SESSION_VOCABULARY_SQL, (session_id,)).fetchall()
 
             return [dict(row) for row in rows]
 
@@ -139,26 +319,25 @@ class DatabaseService:
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
-            query = """
-                SELECT
-                    f.card_id, f.word, f.definition_en, f.definition_cn,
-                    f.example_en, f.example_cn, f.difficulty,
-                    fp.easiness_factor, fp.repetitions, fp.interval,
-                    fp.next_review_date, fp.last_reviewed_at
-                FROM flashcards f
-                LEFT JOIN flashcard_progress fp ON f.card_id = fp.card_id
-            """
+            query = FLASHCARDS_SQL
 
             params = []
-            if difficulty:
+            if limit:
+                # Still shuffles every matching id, but only ids (read from the
+                # index) rather than whole rows; the sampled rows are joined after
+                sample = "SELECT card_id FROM flashcards"
+                if difficulty:
+                    sample += " WHERE difficulty = ?"
+                    params.append(difficulty)
+
+                query += f" WHERE f.card_id IN ({sample} ORDER BY RANDOM() LIMIT ?)"
+                params.append(limit)
+            elif difficulty:
                 query += " WHERE f.difficulty = ?"
                 params.append(difficulty)
 
             query += " ORDER BY RANDOM()"
 
-            if limit:
-                query += f" LIMIT {limit}"
-
             rows = cursor.execute(query, params).fetchall()
             return [dict(row) for row in rows]
 
@@ -167,22 +346,15 @@ class DatabaseService:
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
-            rows = cursor.execute("""
-                SELECT
-                    f.card_id, f.word, f.definition_en, f.definition_cn,
-                    f.example_en, f.example_cn, f.difficulty,
-                    fp.easiness_factor, fp.repetitions, fp.interval,
-                    fp.next_review_date, fp.last_reviewed_at
-                FROM flashcards f
-                LEFT JOIN flashcard_progress fp ON f.card_id = fp.card_id
-                WHERE fp.next_review_date IS NULL
-                   OR fp.next_review_date <= datetime('now')
-                ORDER BY fp.next_review_date ASC NULLS FIRST
-                LIMIT ?
-            """, (limit,)).fetchall()
+            rows = cursor.execute(DUE_FLASHCARDS_SQL, (limit, limit, limit)).fetchall()
 
             return [dict(row) for row in rows]
 
+    def count_due_cards(self) -> int:
+        """Count reviewed flashcards that are due again"""
+        with self.get_connection() as conn:
+            return conn.execute(DUE_COUNT_SQL).fetchone()[0]
+
     def review_flashcard(self, card_id: int, quality: int) -> Dict[str, Any]:
         """
         Record a flashcard review using SM-2 algorithm
@@ -194,50 +366,65 @@ class DatabaseService:
         Returns:
             Updated progress data
         """
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
+        return self.review_flashcards_bulk([(card_id, quality)])[0]
 
-            # Get current progress
-            row = cursor.execute("""
-                SELECT easiness_factor, repetitions, interval
-                FROM flashcard_progress
-                WHERE card_id = ?
-            """, (card_id,)).fetchone()
+    def review_flashcards_bulk(self, reviews: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+        """
+        Record several flashcard reviews in a single transaction
 
-            if row:
-                ef, reps, interval = row
-            else:
-                # Initialize progress
-                ef, reps, interval = 2.5, 0, 0
+        Args:
+            reviews: (card_id, quality) pairs, applied in order
 
-            # Calculate next review
-            new_ef, new_reps, new_interval, next_review = calculate_next_review(
-                quality, ef, reps, interval
-            )
+        Returns:
+            Updated progress data for each review, in the same order
+        """
+        card_ids = sorted({card_id for card_id, _ in reviews})
+        placeholders = ', '.join('?' * len(card_ids))
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+
+            # Get current progress for every card at once
+            progress = {}
+            for row in cursor.execute(
+                FLASHCARD_PROGRESS_SQL.format(placeholders=placeholders), card_ids
+            ):
+                if row['easiness_factor'] is None:
+                    # Initialize progress
+                    progress[row['card_id']] = (2.5, 0, 0)
+                else:
+                    progress[row['card_id']] = tuple(row)[1:]
+
+            results = []
+            updates = []
+            reviewed_at = int(time.time())
+            for card_id, quality in reviews:
+                if card_id not in progress:
+                    results.append({'card_id': card_id, 'error': 'Flashcard not found'})
+                    continue
+
+                # Calculate next review
+                ef, reps, interval = progress[card_id]
+                new_ef, new_reps, new_interval, next_review = calculate_next_review(
+                    quality, ef, reps, interval
+                )
+                progress[card_id] = (new_ef, new_reps, new_interval)
+
+                updates.append((card_id, new_ef, new_reps, new_interval,
+                                int(next_review.timestamp()), reviewed_at))
+                results.append({
+                    'card_id': card_id,
+                    'easiness_factor': new_ef,
+                    'repetitions': new_reps,
+                    'interval': new_interval,
+                    'next_review_date': int(next_review.timestamp())
+                })
 
             # Update or insert progress
-            cursor.execute("""
-                INSERT INTO flashcard_progress
-                (card_id, easiness_factor, repetitions, interval, next_review_date, last_reviewed_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-                ON CONFLICT(card_id) DO UPDATE SET
-                    easiness_factor = excluded.easiness_factor,
-                    repetitions = excluded.repetitions,
-                    interval = excluded.interval,
-                    next_review_date = excluded.next_review_date,
-                    last_reviewed_at = excluded.last_reviewed_at
-            """, (card_id, new_ef, new_reps, new_interval,
-                  next_review.isoformat(), datetime.now().isoformat()))
+            cursor.executemany(UPSERT_FLASHCARD_PROGRESS_SQL, updates)
 
-            conn.commit()
-
-            return {
-                'card_id': card_id,
-                'easiness_factor': new_ef,
-                'repetitions': new_reps,
-                'interval': new_interval,
-                'next_review_date': next_review.isoformat()
-            }
+            return results
 
     # ========== Exercises ==========
 
@@ -248,11 +435,7 @@ class DatabaseService:
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
-            query = """
-                SELECT exercise_id, session_id, exercise_type, question,
-                       options, correct_answer, explanation, difficulty
-                FROM exercises
-            """
+            query = EXERCISES_SQL
 
             params = []
             conditions = []
@@ -265,10 +448,14 @@ class DatabaseService:
                 conditions.append("exercise_type = ?")
                 params.append(exercise_type)
 
+            # Still shuffles every matching id, but only ids rather than whole
+            # rows; the sampled rows are fetched after
+            sample = "SELECT exercise_id FROM exercises"
             if conditions:
-                query += " WHERE " + " AND ".join(conditions)
+                sample += " WHERE " + " AND ".join(conditions)
 
-            query += f" ORDER BY RANDOM() LIMIT {limit}"
+            query += f" WHERE exercise_id IN ({sample} ORDER BY RANDOM() LIMIT ?) ORDER BY RANDOM()"
+            params.append(limit)
 
             rows = cursor.execute(query, params).fetchall()
             return [dict(row) for row in rows]
@@ -284,35 +471,56 @@ class DatabaseService:
                 'explanation': str
             }
         """
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
+        result = self.submit_exercise_answers_bulk([(exercise_id, user_answer)])[0]
+        result.pop('exercise_id')
+        return result
 
-            # Get exercise
-            row = cursor.execute("""
-                SELECT correct_answer, explanation
-                FROM exercises
-                WHERE exercise_id = ?
-            """, (exercise_id,)).fetchone()
+    def submit_exercise_answers_bulk(self, answers: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
+        """
+        Submit several exercise answers in a single transaction
 
-            if not row:
-                return {'error': 'Exercise not found'}
+        Args:
+            answers: (exercise_id, user_answer) pairs
 
-            exercise = dict(row)
-            is_correct = user_answer.strip().upper() == exercise['correct_answer'].strip().upper()
+        Returns:
+            Result for each answer, in the same order
+        """
+        exercise_ids = sorted({exercise_id for exercise_id, _ in answers})
+        placeholders = ', '.join('?' * len(exercise_ids))
 
-            # Record attempt
-            cursor.execute("""
-                INSERT INTO exercise_attempts (exercise_id, user_answer, is_correct)
-                VALUES (?, ?, ?)
-            """, (exercise_id, user_answer, is_correct))
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+
+            # Get all exercises at once
+            exercises = {
+                row['exercise_id']: dict(row)
+                for row in cursor.execute(
+                    EXERCISE_ANSWER_SQL.format(placeholders=placeholders), exercise_ids
+                )
+            }
 
-            conn.commit()
+            results = []
+            attempts = []
+            for exercise_id, user_answer in answers:
+                exercise = exercises.get(exercise_id)
+                if not exercise:
+                    results.append({'exercise_id': exercise_id, 'error': 'Exercise not found'})
+                    continue
 
-            return {
-                'is_correct': is_correct,
-                'correct_answer': exercise['correct_answer'],
-                'explanation': exercise['explanation']
-            }
+                is_correct = user_answer.strip().upper() == exercise['correct_answer'].strip().upper()
+                attempts.append((exercise_id, user_answer, is_correct))
+                results.append({
+                    'exercise_id': exercise_id,
+                    'is_correct': is_correct,
+                    'correct_answer': exercise['correct_answer'],
+                    'explanation': exercise['explanation']
+                })
+
+            # Record attempts
+            cursor.executemany(INSERT_EXERCISE_ATTEMPT_SQL, attempts)
+
+            return results
 
     # ========== Progress ==========
 
@@ -321,31 +529,13 @@ class DatabaseService:
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
-            # Count completed activities
-            completed_activities = cursor.execute("""
-                SELECT COUNT(*) FROM user_progress WHERE completed = 1
-            """).fetchone()[0]
-
-            # Total activities
-            total_activities = cursor.execute("""
-                SELECT COUNT(*) FROM activities
-            """).fetchone()[0]
-
-            # Flashcard stats
-            flashcard_stats = cursor.execute("""
-                SELECT
-                    COUNT(*) as total,
-                    SUM(CASE WHEN next_review_date <= datetime('now') THEN 1 ELSE 0 END) as due
-                FROM flashcard_progress
-            """).fetchone()
-
-            # Exercise stats
-            exercise_stats = cursor.execute("""
-                SELECT
-                    COUNT(*) as total,
-                    SUM(CASE WHEN is_correct = 1 THEN 1 ELSE 0 END) as correct
-                FROM exercise_attempts
-            """).fetchone()
+            # All counts in a single round trip
+            stats = cursor.execute(PROGRESS_SQL).fetchone()
+
+            completed_activities = stats['completed_activities']
+            total_activities = stats['total_activities']
+            attempted = stats['attempted_exercises']
+            correct = stats['correct_exercises']
 
             return {
                 'activities': {
@@ -354,13 +544,13 @@ class DatabaseService:
                     'percentage': round(completed_activities / total_activities * 100, 1) if total_activities > 0 else 0
                 },
                 'flashcards': {
-                    'reviewed': flashcard_stats[0] if flashcard_stats else 0,
-                    'due': flashcard_stats[1] if flashcard_stats else 0
+                    'reviewed': stats['reviewed_flashcards'],
+                    'due': stats['due_flashcards']
                 },
                 'exercises': {
-                    'attempted': exercise_stats[0] if exercise_stats else 0,
-                    'correct': exercise_stats[1] if exercise_stats else 0,
-                    'accuracy': round(exercise_stats[1] / exercise_stats[0] * 100, 1) if exercise_stats and exercise_stats[0] > 0 else 0
+                    'attempted': attempted,
+                    'correct': correct,
+                    'accuracy': round(correct / attempted * 100, 1) if attempted > 0 else 0
                 }
             }
 
@@ -369,13 +559,17 @@ class DatabaseService:
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
-            cursor.execute("""
-                INSERT INTO user_progress (activity_id, completed, completed_at)
-                VALUES (?, 1, ?)
-                ON CONFLICT(activity_id) DO UPDATE SET
-                    completed = 1,
-                    completed_at = excluded.completed_at
-            """, (activity_id, datetime.now().isoformat()))
+            try:
+                cursor.execute(MARK_ACTIVITY_COMPLETE_SQL,
+                               (activity_id, datetime.now().isoformat()))
+            except sqlite3.IntegrityError:
+                return False
 
             conn.commit()
             return True
+
+
+@lru_cache(maxsize=1)
+def get_db() -> DatabaseService:
+    """Get the shared database service (FastAPI dependency)"""
+    return DatabaseService(settings.db_path)
@@ -2,14 +2,30 @@
 HuggingFace Dataset Downloader
 Downloads bbc_learning.db from HF Dataset on startup
 """
+import importlib.util
 import logging
+import os
+import struct
 from pathlib import Path
 from typing import Optional
 
+# Use the Rust multi-connection downloader when installed; huggingface_hub
+# reads this flag at import time, so it must be set before the import below
+if importlib.util.find_spec("hf_transfer"):
+    os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
 from huggingface_hub import hf_hub_download, HfApi
 
 logger = logging.getLogger(__name__)
 
+SQLITE_HEADER = b"SQLite format 3\x00"
+
+# The database header is the first 100 bytes of the file
+SQLITE_HEADER_SIZE = 100
+
+# Don't let a slow Hub metadata request hold up startup
+ETAG_TIMEOUT = 5
+
 
 class HFDatasetService:
     """Service for downloading database from HuggingFace Dataset"""
@@ -30,10 +46,15 @@ class HFDatasetService:
 
         local_file = Path(local_path)
 
-        # Check if file already exists
+        # Keep an existing database (it holds the user's progress), unless it
+        # is truncated or not a SQLite file at all
         if local_file.exists():
-            logger.info(f"Database already exists at {local_path}")
-            return True
+            if self._is_sqlite_file(local_file):
+                logger.info(f"Database already exists at {local_path}")
+                return True
+
+            logger.warning(f"Database at {local_path} is not a valid SQLite file, re-downloading")
+            self._set_aside(local_file)
 
         logger.info(f"Downloading database from HF Dataset: {self.dataset_id}")
 
@@ -44,7 +65,8 @@ class HFDatasetService:
                 filename="bbc_learning.db",
                 repo_type="dataset",
                 token=self.token,
-                local_dir=local_file.parent
+                local_dir=local_file.parent,
+                etag_timeout=ETAG_TIMEOUT
             )
 
             logger.info(f"✓ Database downloaded to: {downloaded_path}")
@@ -54,6 +76,47 @@ class HFDatasetService:
             logger.error(f"Failed to download database from HF Dataset: {e}")
             return False
 
+    @staticmethod
+    def _is_sqlite_file(path: Path) -> bool:
+        """
+        Check the file starts with the SQLite header and is as long as the
+        header says, so a truncated download is caught too
+        """
+        try:
+            with open(path, 'rb') as f:
+                header = f.read(SQLITE_HEADER_SIZE)
+            file_size = path.stat().st_size
+        except OSError:
+            return False
+
+        if len(header) < SQLITE_HEADER_SIZE or not header.startswith(SQLITE_HEADER):
+            return False
+
+        # Page size at offset 16 (1 means 65536), page count at offset 28; the
+        # count is only trustworthy when the change counter at 24 matches the
+        # version-valid-for number at 92
+        page_size, = struct.unpack_from('>H', header, 16)
+        page_size = 65536 if page_size == 1 else page_size
+        change_counter, page_count = struct.unpack_from('>II', header, 24)
+        valid_for, = struct.unpack_from('>I', header, 92)
+        if page_count and change_counter == valid_for:
+            return file_size >= page_size * page_count
+
+        return True
+
+    @staticmethod
+    def _set_aside(path: Path):
+        """
+        Rename a bad database to *.corrupt rather than deleting it, taking its
+        -wal/-shm files along so they can't be replayed into the new download
+        """
+        for suffix in ("", "-wal", "-shm"):
+            src = path.with_name(path.name + suffix)
+            if src.exists():
+                dest = src.with_name(src.name + ".corrupt")
+                src.replace(dest)
+                logger.warning(f"Moved {src} to {dest}")
+
     def check_dataset_exists(self) -> bool:
         """Check if dataset exists on HuggingFace"""
         if not self.dataset_id:
@@ -5,6 +5,9 @@ Implementation of the SuperMemo 2 algorithm for flashcard review scheduling
 from datetime import datetime, timedelta
 from typing import Tuple
 
+# Easiness factor change for each quality rating (0-5)
+EF_DELTA = tuple(0.1 - (5 - q) * (0.08 + (5 - q) * 0.02) for q in range(6))
+
 
 def calculate_next_review(quality: int, easiness_factor: float, repetitions: int,
                           interval: int) -> Tuple[float, int, int, datetime]:
@@ -27,8 +30,7 @@ def calculate_next_review(quality: int, easiness_factor: float, repetitions: int
         (new_easiness_factor, new_repetitions, new_interval, next_review_date)
     """
     # Update easiness factor
-    new_ef = easiness_factor + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
-    new_ef = max(1.3, new_ef)  # Minimum EF is 1.3
+    new_ef = max(1.3, easiness_factor + EF_DELTA[quality])  # Minimum EF is 1.3
 
     # Update repetitions and interval
     if quality < 3:
@@ -50,27 +52,3 @@ def calculate_next_review(quality: int, easiness_factor: float, repetitions: int
     next_review_date = datetime.now() + timedelta(days=new_interval)
 
     return new_ef, new_repetitions, new_interval, next_review_date
-
-
-def get_due_cards_count(cards: list, current_date: datetime = None) -> int:
-    """
-    Count cards due for review
-
-    Args:
-        cards: List of card dicts with 'next_review_date' field
-        current_date: Current date (defaults to now)
-
-    Returns:
-        Number of cards due for review
-    """
-    if current_date is None:
-        current_date = datetime.now()
-
-    count = 0
-    for card in cards:
-        if card.get('next_review_date'):
-            review_date = datetime.fromisoformat(card['next_review_date'])
-            if review_date <= current_date:
-                count += 1
-
-    return count
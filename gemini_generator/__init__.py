@@ -1,8 +1,22 @@
 """
 Gemini Content Generator Package
 """
-from gemini_generator.gemini_client import GeminiClient
-from gemini_generator.flashcard_generator import FlashcardGenerator
-from gemini_generator.exercise_generator import ExerciseGenerator
+import importlib
+
+# Generators are imported on first access so that touching gemini_generator.config
+# doesn't pull in google.generativeai and its grpc stack
+_LAZY_IMPORTS = {
+    'GeminiClient': 'gemini_generator.gemini_client',
+    'FlashcardGenerator': 'gemini_generator.flashcard_generator',
+    'ExerciseGenerator': 'gemini_generator.exercise_generator',
+}
 
 __all__ = ['GeminiClient', 'FlashcardGenerator', 'ExerciseGenerator']
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,70 @@
+"""
+Gemini Response Cache
+Persists parsed Gemini responses so re-runs don't pay for the same prompt twice
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from typing import Dict, Any, Optional
+
+from gemini_generator.config import CACHE_PATH
+from gemini_generator.db import configure_sqlite
+
+logger = logging.getLogger(__name__)
+
+
+class GeminiCache:
+    """Exact-match cache of parsed JSON responses, keyed by prompt hash"""
+
+    def __init__(self, db_path: str = str(CACHE_PATH)):
+        # Kept out of bbc_learning.db so the shipped database doesn't grow
+        self.conn = configure_sqlite(sqlite3.connect(db_path))
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS gemini_cache (
+                prompt_hash TEXT PRIMARY KEY,
+                response_json TEXT NOT NULL,
+                created_at INTEGER NOT NULL
+            )
+        """)
+        self._memory: Dict[str, Dict[str, Any]] = {}
+
+    def close(self):
+        """Close cache database"""
+        self.conn.close()
+
+    @staticmethod
+    def key(prompt: str, variant: int = 0) -> str:
+        """
+        Cache key for a prompt
+        variant distinguishes deliberate repeats of the same prompt
+        """
+        return hashlib.sha256(f"{variant}\0{prompt}".encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached response"""
+        if key in self._memory:
+            return self._memory[key]
+
+        row = self.conn.execute(
+            "SELECT response_json FROM gemini_cache WHERE prompt_hash = ?", (key,)
+        ).fetchone()
+
+        if not row:
+            return None
+
+        result = json.loads(row[0])
+        self._memory[key] = result
+        return result
+
+    def set(self, key: str, result: Dict[str, Any]):
+        """Store a parsed response"""
+        self._memory[key] = result
+
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO gemini_cache (prompt_hash, response_json, created_at) "
+                "VALUES (?, ?, ?)",
+                (key, json.dumps(result, ensure_ascii=False), int(time.time()))
+            )
@@ -11,6 +11,10 @@ GEMINI_MODEL = 'gemini-2.0-flash-exp'  # Gemini 2.0 Flash
 # Generation parameters
 TEMPERATURE = 0.7
 MAX_OUTPUT_TOKENS = 2048
+MAX_CONTENT_CHARS = 2000  # Transcript excerpt sent with each exercise prompt
+CONCURRENCY = 5  # Simultaneous Gemini requests
+REQUESTS_PER_MINUTE = 60  # Client-side pacing to stay under the API quota
+MAX_RETRIES = 6  # Attempts per request on quota/timeout errors
 
 # Difficulty levels
 DIFFICULTY_LEVELS = ['easy', 'medium', 'hard']
@@ -88,3 +92,4 @@ Respond in JSON format:
 # Project paths
 PROJECT_ROOT = Path(__file__).parent.parent
 DB_PATH = PROJECT_ROOT / "data" / "bbc_learning.db"
+CACHE_PATH = PROJECT_ROOT / "data" / "gemini_cache.db"
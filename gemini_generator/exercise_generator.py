@@ -4,13 +4,17 @@ Exercise Generator using Gemini
 Generates PET-style exercises from session content
 """
 import argparse
+import asyncio
 import json
 import logging
-import sqlite3
 import sys
-from typing import Optional, List
+from collections import defaultdict
+from typing import Optional, List, Dict, Iterator, Tuple
 
-from gemini_generator.config import EXERCISE_PROMPT, EXERCISE_TYPES, DB_PATH
+from gemini_generator.config import (
+    EXERCISE_PROMPT, EXERCISE_TYPES, DB_PATH, CONCURRENCY, MAX_CONTENT_CHARS
+)
+from gemini_generator.db import connect_readonly, connect_readwrite, write_transaction
 from gemini_generator.gemini_client import GeminiClient
 
 logging.basicConfig(
@@ -19,19 +23,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Exercise types per session type, built once rather than on every lookup
+_TYPE_MAP: Dict[str, Tuple[str, ...]] = {
+    session_type: tuple(types) for session_type, types in EXERCISE_TYPES.items()
+}
+_DEFAULT_TYPES = _TYPE_MAP['vocabulary']
+
 
 class ExerciseGenerator:
     """Generate PET-style exercises using Gemini"""
 
+    _INSERT_EXERCISE_SQL = """
+        INSERT INTO exercises
+        (session_id, exercise_type, question, options, correct_answer,
+         explanation, difficulty)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """
+
     def __init__(self, db_path: str = str(DB_PATH)):
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
-        self.conn.row_factory = sqlite3.Row
+        # Write connection first: it switches the file to WAL, which the
+        # read-only connection can't do itself
+        self.rw_conn = connect_readwrite(db_path)
+        self.ro_conn = connect_readonly(db_path)
         self.gemini = GeminiClient()
 
     def close(self):
-        """Close database connection"""
-        self.conn.close()
+        """Close database connections"""
+        # Let SQLite re-analyze tables whose statistics the inserts have skewed
+        self.rw_conn.execute("PRAGMA optimize")
+        self.ro_conn.close()
+        self.rw_conn.close()
 
     def __enter__(self):
         return self
@@ -39,9 +61,9 @@ class ExerciseGenerator:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
-    def get_sessions_without_exercises(self, limit: Optional[int] = None) -> List[dict]:
-        """Get sessions that don't have exercises yet"""
-        cursor = self.conn.cursor()
+    def get_sessions_without_exercises(self, limit: Optional[int] = None) -> Iterator[dict]:
+        """Stream sessions that don't have exercises yet"""
+        cursor = self.ro_conn.cursor()
 
         query = """
             SELECT
@@ -53,20 +75,22 @@ class ExerciseGenerator:
                 u.unit_number
             FROM sessions s
             JOIN units u ON s.unit_id = u.unit_id
-            LEFT JOIN exercises e ON e.session_id = s.session_id
-            WHERE e.exercise_id IS NULL
+            WHERE NOT EXISTS (SELECT 1 FROM exercises e WHERE e.session_id = s.session_id)
             AND s.transcript_text IS NOT NULL
             AND s.transcript_text != ''
         """
 
+        params = []
         if limit:
-            query += f" LIMIT {limit}"
+            query += " LIMIT ?"
+            params.append(limit)
 
-        return [dict(row) for row in cursor.execute(query).fetchall()]
+        for row in cursor.execute(query, params):
+            yield dict(row)
 
     def get_session_vocabulary(self, session_id: int) -> List[dict]:
         """Get vocabulary items for a session"""
-        cursor = self.conn.cursor()
+        cursor = self.ro_conn.cursor()
 
         query = """
             SELECT word, definition
@@ -78,55 +102,83 @@ class ExerciseGenerator:
 
         return [dict(row) for row in cursor.execute(query, (session_id,)).fetchall()]
 
-    def determine_exercise_types(self, session_type: str) -> List[str]:
-        """Determine appropriate exercise types for a session"""
-        if session_type in EXERCISE_TYPES:
-            return EXERCISE_TYPES[session_type]
-        elif session_type in ['vocabulary', 'grammar']:
-            return EXERCISE_TYPES['vocabulary'] + EXERCISE_TYPES['grammar']
-        elif session_type in ['reading', 'listening']:
-            return EXERCISE_TYPES[session_type]
-        else:
-            # Default to vocabulary exercises
-            return EXERCISE_TYPES['vocabulary']
+    def get_vocabulary_for_sessions(self, session_ids: List[int]) -> Dict[int, List[dict]]:
+        """Get vocabulary items for several sessions in one query, grouped by session"""
+        cursor = self.ro_conn.cursor()
 
-    def generate_exercise(self, session_id: int, session_type: str,
-                         exercise_type: str, content: str, vocabulary: List[dict]) -> bool:
-        """
-        Generate an exercise for a session
-        Returns: True if successful
+        query = f"""
+            SELECT session_id, word, definition
+            FROM session_vocabulary
+            WHERE session_id IN ({', '.join('?' * len(session_ids))})
+            AND word IS NOT NULL
+            AND word != ''
         """
-        logger.info(f"Generating {exercise_type} exercise for session {session_id}")
 
-        # Format vocabulary for prompt
-        vocab_text = "\n".join([
+        vocabulary = defaultdict(list)
+        for row in cursor.execute(query, session_ids):
+            vocabulary[row['session_id']].append({'word': row['word'], 'definition': row['definition']})
+
+        return vocabulary
+
+    def determine_exercise_types(self, session_type: str) -> Tuple[str, ...]:
+        """Determine appropriate exercise types for a session"""
+        # Default to vocabulary exercises
+        return _TYPE_MAP.get(session_type, _DEFAULT_TYPES)
+
+    @staticmethod
+    def format_vocabulary(vocabulary: List[dict]) -> str:
+        """Format vocabulary items for the exercise prompt"""
+        return "\n".join([
             f"- {v['word']}: {v.get('definition', '')}"
             for v in vocabulary
         ])
 
+    @staticmethod
+    def trim_content(content: str, limit: int = MAX_CONTENT_CHARS) -> str:
+        """
+        Shorten a transcript for the exercise prompt
+        Collapses whitespace and cuts at a sentence end (or at least a word
+        boundary) so no tokens are spent on a half-finished sentence
+        """
+        text = ' '.join(content.split())
+        if len(text) <= limit:
+            return text
+
+        text = text[:limit]
+        end = text.rfind('.')
+        if end > limit // 2:
+            return text[:end + 1]
+        return text.rsplit(' ', 1)[0]
+
+    async def generate_exercise(self, session_id: int, session_type: str,
+                                exercise_type: str, content: str, vocab_text: str,
+                                semaphore: asyncio.Semaphore, variant: int = 0) -> Optional[tuple]:
+        """
+        Generate an exercise for a session
+        content: session transcript, as shortened by trim_content
+        vocab_text: session vocabulary, as formatted by format_vocabulary
+        variant: index of this exercise among same-type exercises for the session
+        Returns: Row for the exercises table, or None on failure
+        """
+        logger.info(f"Generating {exercise_type} exercise for session {session_id}")
+
         # Build prompt
         prompt = EXERCISE_PROMPT.format(
             exercise_type=exercise_type.replace('_', ' '),
             session_type=session_type,
-            content=content[:2000],  # Limit content length
+            content=content,
             vocabulary=vocab_text or "No specific vocabulary"
         )
 
         # Generate exercise
-        result = self.gemini.generate_json(prompt)
+        async with semaphore:
+            result = await self.gemini.generate_json_async(prompt, variant=variant)
 
         if not result:
             logger.error(f"Failed to generate exercise")
-            return False
-
-        # Insert exercise
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT INTO exercises
-            (session_id, exercise_type, question, options, correct_answer,
-             explanation, difficulty)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
+            return None
+
+        return (
             session_id,
             exercise_type,
             result.get('question'),
@@ -134,37 +186,53 @@ class ExerciseGenerator:
             result.get('correct_answer'),
             result.get('explanation'),
             result.get('difficulty', 'medium')
-        ))
-
-        self.conn.commit()
-
-        logger.info(f"✓ Created {exercise_type} exercise")
-        return True
+        )
 
-    def generate_for_session(self, session_id: int, exercises_per_type: int = 2) -> int:
+    def save_exercises(self, rows: List[tuple]) -> int:
         """
-        Generate exercises for a single session
-        Returns: Number of exercises created
+        Insert generated exercises in a single transaction
+        Returns: Number of exercises saved
         """
-        cursor = self.conn.cursor()
+        with write_transaction(self.rw_conn):
+            self.rw_conn.executemany(self._INSERT_EXERCISE_SQL, rows)
 
-        # Get session info
-        row = cursor.execute("""
-            SELECT session_id, type, title, transcript_text
-            FROM sessions
-            WHERE session_id = ?
-        """, (session_id,)).fetchone()
-
-        if not row:
-            logger.error(f"Session {session_id} not found")
-            return 0
+        return len(rows)
 
-        session = dict(row)
+    async def _generate_session_exercises(self, session_id: int, exercises_per_type: int,
+                                          semaphore: asyncio.Semaphore,
+                                          vocabulary: Optional[List[dict]] = None,
+                                          session_row: Optional[dict] = None) -> List[tuple]:
+        """
+        Generate (but don't save) exercises for a single session
+        vocabulary: pre-fetched session vocabulary; looked up when not given
+        session_row: pre-fetched session info; looked up when not given
+        Returns: Rows for the exercises table
+        """
+        session = session_row
+
+        if session is None:
+            # Get session info
+            cursor = self.ro_conn.cursor()
+            row = cursor.execute("""
+                SELECT session_id, type, title, transcript_text
+                FROM sessions
+                WHERE session_id = ?
+            """, (session_id,)).fetchone()
+
+            if not row:
+                logger.error(f"Session {session_id} not found")
+                return []
+
+            session = dict(row)
         session_type = session['type']
-        content = session['transcript_text'] or ""
 
         # Get vocabulary
-        vocabulary = self.get_session_vocabulary(session_id)
+        if vocabulary is None:
+            vocabulary = self.get_session_vocabulary(session_id)
+
+        # Same for every exercise of this session, so prepare them once
+        content = self.trim_content(session['transcript_text'] or "")
+        vocab_text = self.format_vocabulary(vocabulary)
 
         # Determine exercise types
         exercise_types = self.determine_exercise_types(session_type)
@@ -172,44 +240,69 @@ class ExerciseGenerator:
         logger.info(f"\nGenerating exercises for session {session_id} ({session_type})")
         logger.info(f"Exercise types: {', '.join(exercise_types)}")
 
-        success_count = 0
+        # Generate exercises for each type; the calls are independent, so run
+        # them together and let the shared semaphore bound the concurrency
+        results = await asyncio.gather(*(
+            self.generate_exercise(
+                session_id=session_id,
+                session_type=session_type,
+                exercise_type=ex_type,
+                content=content,
+                vocab_text=vocab_text,
+                semaphore=semaphore,
+                variant=i
+            )
+            for ex_type in exercise_types[:2]  # Limit to 2 types per session
+            for i in range(exercises_per_type)
+        ), return_exceptions=True)
 
-        # Generate exercises for each type
-        for ex_type in exercise_types[:2]:  # Limit to 2 types per session
-            for i in range(exercises_per_type):
-                success = self.generate_exercise(
-                    session_id=session_id,
-                    session_type=session_type,
-                    exercise_type=ex_type,
-                    content=content,
-                    vocabulary=vocabulary
-                )
+        rows = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Failed to generate exercise for session {session_id}: {result}")
+            elif result:
+                rows.append(result)
 
-                if success:
-                    success_count += 1
+        logger.info(f"✓ Generated {len(rows)} exercises for session {session_id}")
+        return rows
 
-        logger.info(f"✓ Created {success_count} exercises for session {session_id}")
-        return success_count
+    async def generate_for_session(self, session_id: int, exercises_per_type: int = 2) -> int:
+        """
+        Generate exercises for a single session
+        Returns: Number of exercises created
+        """
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+        rows = await self._generate_session_exercises(session_id, exercises_per_type, semaphore)
 
-    def generate_batch(self, batch_size: int = 5, exercises_per_session: int = 4) -> int:
+        return self.save_exercises(rows)
+
+    async def generate_batch(self, batch_size: int = 5, exercises_per_session: int = 4) -> int:
         """
-        Generate exercises in batch
+        Generate exercises in batch, running up to CONCURRENCY Gemini requests at once
         Returns: Total number of exercises created
         """
-        sessions = self.get_sessions_without_exercises(limit=batch_size)
+        sessions = list(self.get_sessions_without_exercises(limit=batch_size))
 
         if not sessions:
             logger.info("No sessions to process")
             return 0
 
-        total = 0
+        vocabulary = self.get_vocabulary_for_sessions([s['session_id'] for s in sessions])
 
-        for session in sessions:
-            count = self.generate_for_session(
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+        results = await asyncio.gather(*(
+            self._generate_session_exercises(
                 session_id=session['session_id'],
-                exercises_per_type=exercises_per_session // 2
+                exercises_per_type=exercises_per_session // 2,
+                semaphore=semaphore,
+                vocabulary=vocabulary[session['session_id']],
+                session_row=session
             )
-            total += count
+            for session in sessions
+        ))
+
+        # Write once every request has completed
+        total = self.save_exercises([row for rows in results for row in rows])
 
         logger.info(f"\n{'='*60}")
         logger.info(f"Batch complete: {total} exercises created for {len(sessions)} sessions")
@@ -217,7 +310,7 @@ class ExerciseGenerator:
 
         return total
 
-    def generate_all(self) -> int:
+    async def generate_all(self) -> int:
         """
         Generate exercises for all sessions
         Returns: Total number of exercises created
@@ -226,7 +319,7 @@ class ExerciseGenerator:
         batch_size = 5
 
         while True:
-            count = self.generate_batch(batch_size)
+            count = await self.generate_batch(batch_size)
             total += count
 
             if count == 0:
@@ -257,11 +350,11 @@ def main():
 
     with ExerciseGenerator(db_path=args.db) as generator:
         if args.session:
-            generator.generate_for_session(args.session)
+            asyncio.run(generator.generate_for_session(args.session))
         elif args.all:
-            generator.generate_all()
+            asyncio.run(generator.generate_all())
         else:
-            generator.generate_batch(batch_size=args.batch)
+            asyncio.run(generator.generate_batch(batch_size=args.batch))
 
 
 if __name__ == '__main__':
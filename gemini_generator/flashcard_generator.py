@@ -4,12 +4,15 @@ Flashcard Generator using Gemini
 Generates child-friendly flashcards from vocabulary
 """
 import argparse
+import asyncio
 import logging
 import sqlite3
 import sys
 from pathlib import Path
+from typing import Optional, List, Iterator
 
-from gemini_generator.config import FLASHCARD_PROMPT, DB_PATH
+from gemini_generator.config import FLASHCARD_PROMPT, DB_PATH, CONCURRENCY
+from gemini_generator.db import connect_readonly, connect_readwrite, write_transaction
 from gemini_generator.gemini_client import GeminiClient
 
 logging.basicConfig(
@@ -22,15 +25,27 @@ logger = logging.getLogger(__name__)
 class FlashcardGenerator:
     """Generate flashcards from vocabulary using Gemini"""
 
+    _INSERT_FLASHCARD_SQL = """
+        INSERT INTO flashcards
+        (vocab_id, source_table, word, definition_en, definition_cn,
+         example_en, example_cn, difficulty)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
     def __init__(self, db_path: str = str(DB_PATH)):
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
-        self.conn.row_factory = sqlite3.Row
+        # Write connection first: it switches the file to WAL, which the
+        # read-only connection can't do itself
+        self.rw_conn = connect_readwrite(db_path)
+        self.ro_conn = connect_readonly(db_path)
         self.gemini = GeminiClient()
 
     def close(self):
-        """Close database connection"""
-        self.conn.close()
+        """Close database connections"""
+        # Let SQLite re-analyze tables whose statistics the inserts have skewed
+        self.rw_conn.execute("PRAGMA optimize")
+        self.ro_conn.close()
+        self.rw_conn.close()
 
     def __enter__(self):
         return self
@@ -38,36 +53,37 @@ class FlashcardGenerator:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
-    def get_vocabulary_items(self, limit: Optional[int] = None) -> list:
+    def get_vocabulary_items(self, limit: Optional[int] = None) -> Iterator[sqlite3.Row]:
         """
-        Get vocabulary items that don't have flashcards yet
-        Returns: List of (vocab_id, word, definition, source_table)
+        Stream vocabulary items that don't have flashcards yet
+        Yields: Rows of (vocab_id, word, definition, source_table)
         """
-        cursor = self.conn.cursor()
+        cursor = self.ro_conn.cursor()
 
         # Get from session_vocabulary
         query = """
             SELECT sv.vocab_id, sv.word, sv.definition, 'session_vocabulary' as source_table
             FROM session_vocabulary sv
-            LEFT JOIN flashcards f ON f.vocab_id = sv.vocab_id AND f.source_table = 'session_vocabulary'
-            WHERE f.card_id IS NULL
+            WHERE NOT EXISTS (
+                SELECT 1 FROM flashcards f
+                WHERE f.vocab_id = sv.vocab_id AND f.source_table = 'session_vocabulary'
+            )
             AND sv.word IS NOT NULL
             AND sv.word != ''
         """
 
+        params = []
         if limit:
-            query += f" LIMIT {limit}"
-
-        items = cursor.execute(query).fetchall()
+            query += " LIMIT ?"
+            params.append(limit)
 
-        logger.info(f"Found {len(items)} vocabulary items without flashcards")
-        return items
+        yield from cursor.execute(query, params)
 
-    def generate_flashcard(self, vocab_id: int, word: str, definition: str,
-                          source_table: str) -> bool:
+    async def generate_flashcard(self, vocab_id: int, word: str, definition: str,
+                                 source_table: str, semaphore: asyncio.Semaphore) -> Optional[tuple]:
         """
         Generate a flashcard for a vocabulary item
-        Returns: True if successful
+        Returns: Row for the flashcards table, or None on failure
         """
         logger.info(f"Generating flashcard for: {word}")
 
@@ -78,20 +94,15 @@ class FlashcardGenerator:
         )
 
         # Generate content
-        result = self.gemini.generate_json(prompt)
+        async with semaphore:
+            result = await self.gemini.generate_json_async(prompt)
 
         if not result:
             logger.error(f"Failed to generate flashcard for: {word}")
-            return False
-
-        # Insert flashcard
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT INTO flashcards
-            (vocab_id, source_table, word, definition_en, definition_cn,
-             example_en, example_cn, difficulty)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+            return None
+
+        logger.info(f"✓ Generated flashcard for: {word}")
+        return (
             vocab_id,
             source_table,
             word,
@@ -100,36 +111,52 @@ class FlashcardGenerator:
             result.get('example_en'),
             result.get('example_cn'),
             result.get('difficulty', 'medium')
-        ))
+        )
 
-        self.conn.commit()
+    def save_flashcards(self, rows: List[tuple]) -> int:
+        """
+        Insert generated flashcards in a single transaction
+        Returns: Number of flashcards saved
+        """
+        with write_transaction(self.rw_conn):
+            self.rw_conn.executemany(self._INSERT_FLASHCARD_SQL, rows)
 
-        logger.info(f"✓ Created flashcard for: {word}")
-        return True
+        return len(rows)
 
-    def generate_batch(self, batch_size: int = 10) -> int:
+    async def generate_batch(self, batch_size: int = 10) -> int:
         """
-        Generate flashcards in batch
+        Generate flashcards in batch, running up to CONCURRENCY Gemini requests at once
         Returns: Number of flashcards created
         """
-        items = self.get_vocabulary_items(limit=batch_size)
+        items = list(self.get_vocabulary_items(limit=batch_size))
+
+        logger.info(f"Found {len(items)} vocabulary items without flashcards")
 
         if not items:
             logger.info("No vocabulary items to process")
             return 0
 
-        success_count = 0
-
-        for item in items:
-            success = self.generate_flashcard(
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+        results = await asyncio.gather(*(
+            self.generate_flashcard(
                 vocab_id=item['vocab_id'],
                 word=item['word'],
                 definition=item['definition'],
-                source_table=item['source_table']
+                source_table=item['source_table'],
+                semaphore=semaphore
             )
+            for item in items
+        ), return_exceptions=True)
+
+        rows = []
+        for item, result in zip(items, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to generate flashcard for '{item['word']}': {result}")
+            elif result:
+                rows.append(result)
 
-            if success:
-                success_count += 1
+        # Write once every request has completed
+        success_count = self.save_flashcards(rows)
 
         logger.info(f"\n{'='*60}")
         logger.info(f"Batch complete: {success_count}/{len(items)} flashcards created")
@@ -137,7 +164,7 @@ class FlashcardGenerator:
 
         return success_count
 
-    def generate_all(self) -> int:
+    async def generate_all(self) -> int:
         """
         Generate flashcards for all vocabulary items
         Returns: Total number of flashcards created
@@ -146,7 +173,7 @@ class FlashcardGenerator:
         batch_size = 10
 
         while True:
-            count = self.generate_batch(batch_size)
+            count = await self.generate_batch(batch_size)
             total += count
 
             if count < batch_size:
@@ -177,9 +204,9 @@ def main():
 
     with FlashcardGenerator(db_path=args.db) as generator:
         if args.all:
-            generator.generate_all()
+            asyncio.run(generator.generate_all())
         else:
-            generator.generate_batch(batch_size=args.batch)
+            asyncio.run(generator.generate_batch(batch_size=args.batch))
 
 
 if __name__ == '__main__':
@@ -1,14 +1,21 @@
 """
 Gemini API Client
 """
+import asyncio
 import json
 import logging
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 
-from gemini_generator.config import GEMINI_API_KEY, GEMINI_MODEL, TEMPERATURE, MAX_OUTPUT_TOKENS
+from gemini_generator.cache import GeminiCache
+from gemini_generator.config import (
+    GEMINI_API_KEY, GEMINI_MODEL, TEMPERATURE, MAX_OUTPUT_TOKENS,
+    REQUESTS_PER_MINUTE, MAX_RETRIES
+)
+from gemini_generator.rate_limiter import RateLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -16,70 +23,165 @@ logger = logging.getLogger(__name__)
 class GeminiClient:
     """Wrapper for Gemini API"""
 
-    def __init__(self, api_key: str = GEMINI_API_KEY):
+    _decoder = json.JSONDecoder()
+
+    # Quota and timeout errors are worth waiting out; anything else won't fix itself
+    RETRYABLE_ERRORS = (google_exceptions.ResourceExhausted, google_exceptions.DeadlineExceeded)
+    # Everything generate handles itself: API errors, and ValueError from a blocked or empty reply
+    HANDLED_ERRORS = (google_exceptions.GoogleAPIError, ValueError)
+
+    def __init__(self, api_key: str = GEMINI_API_KEY, use_cache: bool = True):
         if not api_key:
             raise ValueError("GEMINI_API_KEY not set. Please set it in environment variables.")
 
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel(GEMINI_MODEL)
+        self._gen_config = genai.types.GenerationConfig(
+            temperature=TEMPERATURE,
+            max_output_tokens=MAX_OUTPUT_TOKENS,
+        )
+        self._generate_content = self.model.generate_content
+        self._generate_content_async = self.model.generate_content_async
+        self.cache = GeminiCache() if use_cache else None
+        self.limiter = RateLimiter(REQUESTS_PER_MINUTE)
 
         logger.info(f"Initialized Gemini client with model: {GEMINI_MODEL}")
 
-    def generate(self, prompt: str, max_retries: int = 3) -> Optional[str]:
+    def generate(self, prompt: str, max_retries: int = MAX_RETRIES) -> Optional[str]:
         """
         Generate content using Gemini API
         Returns: Generated text or None on failure
         """
         for attempt in range(max_retries):
+            self.limiter.acquire()
+
             try:
-                response = self.model.generate_content(
-                    prompt,
-                    generation_config={
-                        'temperature': TEMPERATURE,
-                        'max_output_tokens': MAX_OUTPUT_TOKENS,
-                    }
-                )
-
-                if response.text:
-                    return response.text.strip()
-                else:
-                    logger.warning(f"Empty response from Gemini (attempt {attempt + 1})")
-
-            except Exception as e:
-                logger.error(f"Gemini API error (attempt {attempt + 1}): {e}")
-                if attempt < max_retries - 1:
-                    wait_time = 2 ** attempt
-                    logger.info(f"Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
+                response = self._generate_content(prompt, generation_config=self._gen_config)
+                text = self._response_text(response, attempt)
+                if text:
+                    return text
+
+            except self.HANDLED_ERRORS as e:
+                wait_time = self._retry_delay(e, attempt, max_retries)
+                if wait_time is None:
+                    return None
+                time.sleep(wait_time)
 
         return None
 
-    def generate_json(self, prompt: str, max_retries: int = 3) -> Optional[Dict[str, Any]]:
+    async def generate_async(self, prompt: str, max_retries: int = MAX_RETRIES) -> Optional[str]:
         """
-        Generate content and parse as JSON
-        Returns: Parsed JSON dict or None on failure
+        Generate content using Gemini API without blocking the event loop
+        Returns: Generated text or None on failure
         """
-        text = self.generate(prompt, max_retries)
+        for attempt in range(max_retries):
+            await self.limiter.acquire_async()
 
-        if not text:
+            try:
+                response = await self._generate_content_async(prompt, generation_config=self._gen_config)
+                text = self._response_text(response, attempt)
+                if text:
+                    return text
+
+            except self.HANDLED_ERRORS as e:
+                wait_time = self._retry_delay(e, attempt, max_retries)
+                if wait_time is None:
+                    return None
+                await asyncio.sleep(wait_time)
+
+        return None
+
+    @staticmethod
+    def _response_text(response, attempt: int) -> Optional[str]:
+        """
+        Stripped text of a response, or None if it came back empty
+        response.text raises ValueError when the reply was blocked or has no parts
+        """
+        if response.text:
+            return response.text.strip()
+
+        logger.warning(f"Empty response from Gemini (attempt {attempt + 1})")
+        return None
+
+    def _retry_delay(self, error: Exception, attempt: int, max_retries: int) -> Optional[int]:
+        """
+        Log a failed request and decide whether to try again
+        Returns: Seconds to wait before the next attempt, or None to give up
+        """
+        if isinstance(error, self.RETRYABLE_ERRORS):
+            logger.error(f"Gemini API error (attempt {attempt + 1}): {error}")
+            if attempt < max_retries - 1:
+                wait_time = 10 * 2 ** attempt
+                logger.info(f"Retrying in {wait_time} seconds...")
+                return wait_time
             return None
 
-        # Try to extract JSON from response
-        try:
-            # Remove markdown code blocks if present
-            text = text.strip()
-            if text.startswith('```json'):
-                text = text[7:]
-            if text.startswith('```'):
-                text = text[3:]
-            if text.endswith('```'):
-                text = text[:-3]
+        if isinstance(error, ValueError):
+            logger.error(f"Gemini returned no usable text, not retrying: {error}")
+        else:
+            logger.error(f"Gemini API error, not retrying: {error}")
+        return None
+
+    def generate_json(self, prompt: str, max_retries: int = MAX_RETRIES,
+                      variant: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        Generate content and parse as JSON, serving repeats from the cache
+        variant: pass distinct values to get distinct answers to the same prompt
+        Returns: Parsed JSON dict or None on failure
+        """
+        key, cached = self._lookup(prompt, variant)
+        if cached is not None:
+            return cached
+
+        return self._parse_and_store(key, self.generate(prompt, max_retries))
+
+    async def generate_json_async(self, prompt: str, max_retries: int = MAX_RETRIES,
+                                  variant: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        Generate content asynchronously and parse as JSON, serving repeats from the cache
+        variant: pass distinct values to get distinct answers to the same prompt
+        Returns: Parsed JSON dict or None on failure
+        """
+        key, cached = self._lookup(prompt, variant)
+        if cached is not None:
+            return cached
 
-            text = text.strip()
+        return self._parse_and_store(key, await self.generate_async(prompt, max_retries))
 
-            return json.loads(text)
+    def _lookup(self, prompt: str, variant: int) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Cache key for a prompt, and the cached response if there is one"""
+        key = GeminiCache.key(prompt, variant)
+        return key, self.cache.get(key) if self.cache else None
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON response: {e}")
-            logger.debug(f"Response text: {text}")
+    def _parse_and_store(self, key: str, text: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Parse a generated response, caching it if it parsed"""
+        if not text:
             return None
+
+        result = self.parse_json(text)
+        if self.cache and result is not None:
+            self.cache.set(key, result)
+        return result
+
+    @classmethod
+    def parse_json(cls, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Extract the first JSON object from a model response, ignoring any
+        markdown fences or prose around it
+        Returns: Parsed JSON dict or None on failure
+        """
+        start = text.find('{')
+        error = None
+
+        while start != -1:
+            try:
+                result, _ = cls._decoder.raw_decode(text, start)
+                return result
+            except json.JSONDecodeError as e:
+                # A stray brace in surrounding prose; try the next one
+                error = error or e
+                start = text.find('{', start + 1)
+
+        logger.error(f"Failed to parse JSON response: {error or 'no JSON object found'}")
+        logger.debug(f"Response text: {text}")
+        return None
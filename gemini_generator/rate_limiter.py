@@ -0,0 +1,47 @@
+"""
+Gemini Request Rate Limiter
+Paces requests client-side so concurrent generation stays under the API quota
+"""
+import asyncio
+import time
+
+
+class RateLimiter:
+    """
+    Token bucket allowing max_rate requests per time_period
+
+    Holds no asyncio primitives, so one instance can be shared across the
+    event loops created by successive asyncio.run calls
+    """
+
+    def __init__(self, max_rate: int, time_period: float = 60.0):
+        self.capacity = max_rate
+        self.fill_rate = max_rate / time_period
+        self._tokens = float(max_rate)
+        self._updated = time.monotonic()
+
+    def _reserve(self) -> float:
+        """
+        Take a token, going into debt if the bucket is empty
+        Returns: Seconds to wait before the request may be sent
+        """
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.fill_rate)
+        self._updated = now
+        self._tokens -= 1
+
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.fill_rate
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        wait_time = self._reserve()
+        if wait_time:
+            time.sleep(wait_time)
+
+    async def acquire_async(self):
+        """Wait, without blocking the event loop, until a request may be sent"""
+        wait_time = self._reserve()
+        if wait_time:
+            await asyncio.sleep(wait_time)
@@ -180,8 +180,8 @@ CREATE TABLE IF NOT EXISTS flashcard_progress (
     easiness_factor REAL DEFAULT 2.5,  -- SM-2 EF
     repetitions INTEGER DEFAULT 0,
     interval INTEGER DEFAULT 0,        -- days until next review
-    next_review_date DATE,
-    last_reviewed_at TIMESTAMP,
+    next_review_date INTEGER,          -- Unix seconds
+    last_reviewed_at INTEGER,          -- Unix seconds
     FOREIGN KEY (card_id) REFERENCES flashcards(card_id) ON DELETE CASCADE,
     UNIQUE(card_id)
 );
@@ -207,9 +207,12 @@ CREATE INDEX IF NOT EXISTS idx_session_vocab_session ON session_vocabulary(sessi
 CREATE INDEX IF NOT EXISTS idx_unit_vocab_unit ON unit_vocabulary(unit_id);
 CREATE INDEX IF NOT EXISTS idx_bold_words_activity ON bold_words(activity_id);
 CREATE INDEX IF NOT EXISTS idx_downloads_unit ON downloads(unit_id);
-CREATE INDEX IF NOT EXISTS idx_flashcards_vocab ON flashcards(vocab_id);
+CREATE INDEX IF NOT EXISTS idx_flashcards_vocab_source ON flashcards(vocab_id, source_table);
 CREATE INDEX IF NOT EXISTS idx_exercises_session ON exercises(session_id);
+CREATE INDEX IF NOT EXISTS idx_exercises_type ON exercises(exercise_type);
+CREATE INDEX IF NOT EXISTS idx_flashcards_difficulty ON flashcards(difficulty);
 CREATE INDEX IF NOT EXISTS idx_flashcard_progress_next_review ON flashcard_progress(next_review_date);
+CREATE INDEX IF NOT EXISTS idx_exercise_attempts_correct ON exercise_attempts(is_correct);
 
 -- ============================================================
 -- Exercise Type Enumeration (for reference)
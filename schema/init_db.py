@@ -5,6 +5,16 @@ Initialize BBC Learning English SQLite database
 import sqlite3
 from pathlib import Path
 
+# Same set as gemini_generator.db.SQLITE_PRAGMAS (this script runs standalone)
+SQLITE_PRAGMAS = """
+    PRAGMA journal_mode = WAL;
+    PRAGMA synchronous = NORMAL;
+    PRAGMA busy_timeout = 5000;
+    PRAGMA cache_size = -20000;
+    PRAGMA temp_store = MEMORY;
+    PRAGMA foreign_keys = ON;
+"""
+
 def init_database(db_path: str = "data/bbc_learning.db"):
     """Initialize database with schema"""
     db_file = Path(db_path)
@@ -14,23 +24,34 @@ def init_database(db_path: str = "data/bbc_learning.db"):
 
     print(f"Initializing database at: {db_file}")
 
-    # Connect and execute schema
+    # Connect and execute schema; WAL mode is persistent, so every later
+    # connection (API, scraper, generators) opens the file in WAL
     conn = sqlite3.connect(db_file)
+    conn.executescript(SQLITE_PRAGMAS)
     with open(schema_file, 'r', encoding='utf-8') as f:
         schema_sql = f.read()
 
     conn.executescript(schema_sql)
     conn.commit()
 
+    # Refresh planner statistics so the anti-join lookups use the indexes
+    conn.execute("ANALYZE")
+
     # Verify tables created
     cursor = conn.cursor()
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
+    cursor.execute(
+        "SELECT name FROM sqlite_master "
+        "WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+    )
     tables = [row[0] for row in cursor.fetchall()]
 
+    # Count every table in one statement rather than one query per table
+    count_sql = " UNION ALL ".join(
+        f'SELECT ?, COUNT(*) FROM "{table}"' for table in tables
+    )
+
     print(f"✓ Created {len(tables)} tables:")
-    for table in tables:
-        cursor.execute(f"SELECT COUNT(*) FROM {table}")
-        count = cursor.fetchone()[0]
+    for table, count in cursor.execute(count_sql, tables):
         print(f"  - {table}: {count} rows")
 
     conn.close()
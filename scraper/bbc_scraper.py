@@ -1,26 +1,30 @@
 #!/usr/bin/env python3
 """
 BBC Learning English Scraper
-Main scraping logic using Playwright
+Main scraping logic: plain HTTP fetches, with Playwright for pages that need a browser
 """
 import argparse
 import asyncio
 import logging
+import shutil
 import sys
 import time
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set
 
-from playwright.async_api import async_playwright, Page, Browser
+from playwright.async_api import async_playwright, Page, Browser, BrowserContext, Route
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 import requests
+from requests.adapters import HTTPAdapter
 
 from scraper.config import (
     get_level_url, get_unit_url, get_downloads_url,
-    get_random_delay, USER_AGENT, MAX_RETRIES,
+    get_random_delay, USER_AGENT, MAX_RETRIES, MAX_CONCURRENCY, MAX_DOWNLOADS,
     AUDIO_DIR, TRANSCRIPT_DIR, LOG_DIR, DB_PATH
 )
 from scraper.parsers import BBCParser
 from scraper.db_writer import BBCDatabaseWriter
+from scraper.page_cache import PageCache
 
 # Setup logging
 logging.basicConfig(
@@ -33,47 +37,213 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Present in server-rendered BBC pages; without them the page needs a browser
+STATIC_CONTENT_MARKERS = ('<main', '<article')
+
+# Never read by the parser, so the browser doesn't need to download them
+BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font', 'stylesheet'})
+
+# Analytics and ad hosts loaded by BBC pages; nothing they serve is scraped
+BLOCKED_URL_PARTS = (
+    'googletagmanager.com', 'google-analytics.com', 'doubleclick.net',
+    'gstatic.com', 'bbci.co.uk/analytics',
+)
+
+# Shared by all browser contexts; JavaScript is switched on per context
+BROWSER_CONTEXT_OPTIONS = {
+    'user_agent': USER_AGENT,
+    'bypass_csp': True,
+    'viewport': {'width': 800, 'height': 600},
+}
+
+# Audio files are several hundred KiB; copy them in large blocks
+DOWNLOAD_BUFFER_SIZE = 1024 * 1024
+
 
 class BBCScraper:
     """Main scraper class"""
 
-    def __init__(self, db_path: str = str(DB_PATH), download_audio: bool = True):
+    def __init__(self, db_path: str = str(DB_PATH), download_audio: bool = True,
+                 max_concurrency: int = MAX_CONCURRENCY, use_cache: bool = True):
         self.db_path = db_path
         self.download_audio = download_audio
+        self.max_concurrency = max_concurrency
         self.db = BBCDatabaseWriter(db_path)
         self.parser = BBCParser()
+        self.cache = PageCache() if use_cache else None
+        # Shared by page fetches and audio downloads so connections to the
+        # BBC hosts are kept alive; the pool is sized for the worker threads
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=0)
+        self.http.mount('http://', adapter)
+        self.http.mount('https://', adapter)
+        self.http.headers['User-Agent'] = USER_AGENT
+        self.http_semaphore: Optional[asyncio.Semaphore] = None
+        self.db_lock: Optional[asyncio.Lock] = None
+        self.playwright = None
         self.browser: Optional[Browser] = None
-        self.page: Optional[Page] = None
+        self.contexts: List[BrowserContext] = []
+        self.page_pool: Optional[asyncio.Queue] = None
+        self.js_page_pool: Optional[asyncio.Queue] = None
+        self._created_dirs: Set[Path] = set()
 
     async def __aenter__(self):
         """Async context manager entry"""
-        playwright = await async_playwright().start()
-        self.browser = await playwright.chromium.launch(headless=True)
-        self.page = await self.browser.new_page(user_agent=USER_AGENT)
+        self.playwright = await async_playwright().start()
+        self.browser = await self.playwright.chromium.launch(headless=True)
+
+        # One warm browser with a fixed set of long-lived contexts, each
+        # holding one page that is handed out to concurrent fetches; the pool
+        # size caps how many pages are open at once. Pages are first loaded
+        # with JavaScript off, so only the initial HTML is fetched; a single
+        # JavaScript-enabled page handles the few that render client-side
+        self.page_pool = asyncio.Queue()
+        for _ in range(self.max_concurrency):
+            self.page_pool.put_nowait(await self._new_pooled_page(java_script_enabled=False))
+
+        self.js_page_pool = asyncio.Queue()
+        self.js_page_pool.put_nowait(await self._new_pooled_page(java_script_enabled=True))
+
+        self.http_semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.db_lock = asyncio.Lock()
+
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        if self.page:
-            await self.page.close()
+        for context in self.contexts:
+            await context.close()
         if self.browser:
             await self.browser.close()
+        if self.playwright:
+            await self.playwright.stop()
+        self.http.close()
+        if self.cache:
+            self.cache.close()
         self.db.close()
 
+    async def _new_pooled_page(self, java_script_enabled: bool) -> Page:
+        """Open a long-lived browser context and return its page"""
+        context = await self.browser.new_context(
+            java_script_enabled=java_script_enabled, **BROWSER_CONTEXT_OPTIONS
+        )
+        await context.route('**/*', self._block_resources)
+        self.contexts.append(context)
+        return await context.new_page()
+
+    @staticmethod
+    async def _block_resources(route: Route):
+        """Abort requests for resources and trackers the parser never looks at"""
+        request = route.request
+        if (request.resource_type in BLOCKED_RESOURCE_TYPES
+                or any(part in request.url for part in BLOCKED_URL_PARTS)):
+            await route.abort()
+        else:
+            await route.continue_()
+
     async def fetch_page(self, url: str, retries: int = MAX_RETRIES) -> Optional[str]:
-        """Fetch a page with retry logic"""
+        """
+        Fetch a page, trying a plain HTTP GET first
+        Falls back to the browser (with retry logic) when the response is not
+        a usable server-rendered page. Pages are served from the page cache
+        while fresh, and revalidated with a conditional GET once stale
+        """
+        cached = self.cache.get(url) if self.cache else None
+        if cached and self.cache.is_fresh(cached):
+            logger.info(f"Cached: {url}")
+            return cached['body']
+
+        html = await self.fetch_static(url, cached)
+        if html:
+            return html
+
+        logger.info(f"Falling back to browser for: {url}")
+        html = await self._fetch_from_pool(self.page_pool, url, retries, wait_for_content=False)
+
+        if html and not any(marker in html for marker in STATIC_CONTENT_MARKERS):
+            logger.info(f"No server-rendered content, retrying with JavaScript: {url}")
+            html = await self._fetch_from_pool(self.js_page_pool, url, retries, wait_for_content=True)
+
+        # Like fetch_static, only cache pages with real content, so an error page
+        # or empty JS shell isn't kept for the whole TTL
+        if html and self.cache and any(marker in html for marker in STATIC_CONTENT_MARKERS):
+            self.cache.set(url, html)
+        return html
+
+    async def fetch_static(self, url: str, cached: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        Fetch a page without a browser
+        cached: stale page cache entry whose validators make this a conditional GET
+        Returns: HTML, or None if the page looks like it needs JavaScript
+        """
+        headers = {}
+        if cached and cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached and cached['last_modified']:
+            headers['If-Modified-Since'] = cached['last_modified']
+
+        async with self.http_semaphore:
+            try:
+                logger.info(f"Fetching: {url}")
+                response = await asyncio.to_thread(self.http.get, url, headers=headers, timeout=30)
+            except requests.RequestException as e:
+                logger.warning(f"HTTP error fetching {url}: {e}")
+                return None
+
+            if response.status_code == 304 and cached:
+                self.cache.touch(url)
+                return cached['body']
+
+            if response.status_code != 200:
+                logger.warning(f"HTTP {response.status_code}: {url}")
+                return None
+
+            html = response.text
+            if not any(marker in html for marker in STATIC_CONTENT_MARKERS):
+                return None
+
+            if self.cache:
+                self.cache.set(url, html, response.headers.get('ETag'),
+                               response.headers.get('Last-Modified'))
+
+            # Random delay to be polite
+            await asyncio.sleep(get_random_delay())
+
+            return html
+
+    async def _fetch_from_pool(self, pool: asyncio.Queue, url: str, retries: int,
+                               wait_for_content: bool) -> Optional[str]:
+        """Borrow a page from the pool for one fetch"""
+        page = await pool.get()
+        try:
+            return await self._fetch_with_page(page, url, retries, wait_for_content)
+        finally:
+            pool.put_nowait(page)
+
+    async def _fetch_with_page(self, page: Page, url: str, retries: int,
+                               wait_for_content: bool = True) -> Optional[str]:
+        """
+        Fetch a page in the given browser tab
+        wait_for_content: wait for client-side rendering to produce the main
+        content (pointless with JavaScript disabled)
+        """
         for attempt in range(retries):
             try:
                 logger.info(f"Fetching: {url} (attempt {attempt + 1}/{retries})")
-                await self.page.goto(url, wait_until='networkidle', timeout=30000)
+                # The HTML is all that's needed; don't wait for trackers to go quiet
+                await page.goto(url, wait_until='domcontentloaded', timeout=15000)
 
-                # Wait for main content to load
-                await self.page.wait_for_selector('main, article, body', timeout=10000)
+                # Give client-side rendering a moment to produce the main content
+                if wait_for_content:
+                    try:
+                        await page.wait_for_selector('main, article', timeout=5000)
+                    except PlaywrightTimeoutError:
+                        logger.warning(f"No main content element on {url}, using page as is")
 
                 # Random delay to be polite
                 await asyncio.sleep(get_random_delay())
 
-                return await self.page.content()
+                return await page.content()
 
             except Exception as e:
                 logger.error(f"Error fetching {url}: {e}")
@@ -85,6 +255,21 @@ class BBCScraper:
                     logger.error(f"Failed to fetch {url} after {retries} attempts")
                     return None
 
+    async def run_db(self, func, *args, **kwargs):
+        """
+        Run a database batch in a worker thread and commit it, so fetching
+        carries on while the write is flushed
+        The lock keeps the writer's connection to one thread at a time
+        """
+        async with self.db_lock:
+            return await asyncio.to_thread(self._run_and_commit, func, args, kwargs)
+
+    def _run_and_commit(self, func, args, kwargs):
+        """Worker-thread half of run_db"""
+        result = func(*args, **kwargs)
+        self.db.commit()
+        return result
+
     async def scrape_unit(self, level: str, unit_number: int) -> bool:
         """
         Scrape a complete unit
@@ -111,7 +296,8 @@ class BBCScraper:
         unit_title = f"Unit {unit_number}"  # Will be improved with actual title extraction
 
         # Insert unit into database
-        unit_id = self.db.insert_unit(
+        unit_id = await self.run_db(
+            self.db.insert_unit,
             level_id=level,
             unit_number=unit_number,
             title=unit_title,
@@ -125,17 +311,22 @@ class BBCScraper:
         sessions = self.parser.extract_session_links(unit_html, unit_url)
         logger.info(f"Found {len(sessions)} sessions")
 
-        # Scrape each session
-        for session in sessions:
-            success = await self.scrape_session(
+        # Scrape sessions concurrently; the page pool bounds parallel fetches
+        results = await asyncio.gather(*(
+            self.scrape_session(
                 unit_id=unit_id,
                 level=level,
                 unit_number=unit_number,
                 session_number=session['session_number'],
                 session_url=session['url']
             )
+            for session in sessions
+        ), return_exceptions=True)
 
-            if not success:
+        for session, result in zip(sessions, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error scraping session {session['session_number']}: {result}")
+            elif not result:
                 logger.warning(f"Failed to scrape session {session['session_number']}")
 
         # Scrape downloads page
@@ -143,7 +334,7 @@ class BBCScraper:
             await self.scrape_downloads(unit_id, level, unit_number, downloads_url)
 
         # Print statistics
-        stats = self.db.get_scraping_stats()
+        stats = await self.run_db(self.db.get_scraping_stats)
         logger.info(f"\n{'='*60}")
         logger.info(f"Unit {unit_number} completed!")
         logger.info(f"  Sessions: {stats['sessions']}")
@@ -178,7 +369,8 @@ class BBCScraper:
         session_title = f"Session {session_number}"
 
         # Insert session into database
-        session_id = self.db.insert_session(
+        session_id = await self.run_db(
+            self.db.insert_session,
             unit_id=unit_id,
             session_number=session_number,
             session_type=session_type,
@@ -190,22 +382,42 @@ class BBCScraper:
         activities = self.parser.extract_activity_links(session_html, session_url)
         logger.info(f"    Found {len(activities)} activities")
 
-        # Scrape each activity
-        for activity in activities:
-            success = await self.scrape_activity(
+        # Scrape activities concurrently
+        vocabulary: Dict[int, List[Dict[str, Any]]] = {}
+        results = await asyncio.gather(*(
+            self.scrape_activity(
                 session_id=session_id,
                 activity_number=activity['activity_number'],
-                activity_url=activity['url']
+                activity_url=activity['url'],
+                vocabulary=vocabulary
             )
+            for activity in activities
+        ), return_exceptions=True)
 
-            if not success:
+        for activity, result in zip(activities, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error scraping activity {activity['activity_number']}: {result}")
+            elif not result:
                 logger.warning(f"Failed to scrape activity {activity['activity_number']}")
 
+        # Activities finish in any order, so the session vocabulary is written once
+        # afterwards, from the last activity that has any
+        for activity in reversed(activities):
+            items = vocabulary.get(activity['activity_number'])
+            if items:
+                await self.run_db(self.db.insert_session_vocabulary, session_id, items)
+                logger.info(f"    ✓ {len(items)} vocabulary items")
+                break
+
         return True
 
     async def scrape_activity(self, session_id: int, activity_number: int,
-                             activity_url: str) -> bool:
-        """Scrape a single activity"""
+                             activity_url: str,
+                             vocabulary: Dict[int, List[Dict[str, Any]]]) -> bool:
+        """
+        Scrape a single activity
+        Its session vocabulary is added to vocabulary, keyed by activity number
+        """
         logger.info(f"      Activity {activity_number}")
 
         # Check if already scraped
@@ -220,8 +432,16 @@ class BBCScraper:
 
         # Extract activity content
         content = self.parser.extract_activity_content(activity_html)
+        vocabulary[activity_number] = content['session_vocabulary']
+
+        # Activity and bold words land in one transaction
+        await self.run_db(self.save_activity, session_id, activity_number, activity_url, content)
 
-        # Insert activity into database
+        return True
+
+    def save_activity(self, session_id: int, activity_number: int, activity_url: str,
+                      content: Dict[str, Any]):
+        """Insert a parsed activity with its bold words"""
         activity_id = self.db.insert_activity(
             session_id=session_id,
             activity_number=activity_number,
@@ -237,18 +457,11 @@ class BBCScraper:
             transcript_text=content['transcript_text']
         )
 
-        # Insert session vocabulary
-        if content['session_vocabulary']:
-            self.db.insert_session_vocabulary(session_id, content['session_vocabulary'])
-            logger.info(f"        ✓ {len(content['session_vocabulary'])} vocabulary items")
-
         # Insert bold words
         if content['bold_words']:
             self.db.insert_bold_words(activity_id, content['bold_words'])
             logger.info(f"        ✓ {len(content['bold_words'])} bold words")
 
-        return True
-
     async def scrape_downloads(self, unit_id: int, level: str, unit_number: int,
                               downloads_url: str):
         """Scrape downloads page and download audio files"""
@@ -262,20 +475,22 @@ class BBCScraper:
         downloads = self.parser.extract_downloads(downloads_html)
         logger.info(f"  Found {len(downloads)} download resources")
 
-        for download in downloads:
-            # Insert download record
-            local_audio_path = None
-
-            if self.download_audio and download.get('audio_url'):
-                # Download audio file
-                audio_url = download['audio_url']
-                filename = f"session-{download.get('session_number', 0)}_activity-{download.get('activity_number', 0)}.mp3"
-                local_path = AUDIO_DIR / level / f"unit-{unit_number}" / filename
-
-                if self.download_file(audio_url, local_path):
-                    local_audio_path = str(local_path)
-                    logger.info(f"    ✓ Downloaded: {filename}")
-
+        # Download audio files concurrently, then record them in page order
+        local_audio_paths = [None] * len(downloads)
+        if self.download_audio:
+            self.ensure_dir(AUDIO_DIR / level / f"unit-{unit_number}")
+            semaphore = asyncio.Semaphore(MAX_DOWNLOADS)
+            local_audio_paths = await asyncio.gather(*(
+                self.download_audio_file(download, level, unit_number, semaphore)
+                for download in downloads
+            ))
+
+        await self.run_db(self.save_downloads, unit_id, downloads, local_audio_paths)
+
+    def save_downloads(self, unit_id: int, downloads: List[Dict[str, Any]],
+                       local_audio_paths: List[Optional[str]]):
+        """Insert download records"""
+        for download, local_audio_path in zip(downloads, local_audio_paths):
             self.db.insert_download(
                 unit_id=unit_id,
                 resource_title=download.get('resource_title', ''),
@@ -287,24 +502,59 @@ class BBCScraper:
                 local_audio_path=local_audio_path
             )
 
-    def download_file(self, url: str, local_path: Path, retries: int = MAX_RETRIES) -> bool:
-        """Download a file from URL to local path"""
-        local_path.parent.mkdir(parents=True, exist_ok=True)
+    async def download_audio_file(self, download: Dict[str, Any], level: str, unit_number: int,
+                                  semaphore: asyncio.Semaphore) -> Optional[str]:
+        """
+        Download the audio file of a download resource in a worker thread
+        Returns: Local path, or None if there is no audio or the download failed
+        """
+        audio_url = download.get('audio_url')
+        if not audio_url:
+            return None
+
+        filename = f"session-{download.get('session_number', 0)}_activity-{download.get('activity_number', 0)}.mp3"
+        local_path = AUDIO_DIR / level / f"unit-{unit_number}" / filename
+
+        async with semaphore:
+            success = await asyncio.to_thread(self.download_file, audio_url, local_path)
 
+        if not success:
+            return None
+
+        logger.info(f"    ✓ Downloaded: {filename}")
+        return str(local_path)
+
+    def ensure_dir(self, path: Path):
+        """Create a directory, at most once per run"""
+        if path not in self._created_dirs:
+            path.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(path)
+
+    def download_file(self, url: str, local_path: Path, retries: int = MAX_RETRIES) -> bool:
+        """
+        Download a file from URL to local path
+        The parent directory must already exist (see ensure_dir)
+        """
         # Skip if already exists
         if local_path.exists():
             logger.info(f"      File already exists: {local_path.name}")
             return True
 
+        # Written under a temporary name so an interrupted download is never
+        # mistaken for a finished one by the exists() check above
+        partial_path = local_path.with_name(local_path.name + '.part')
+
         for attempt in range(retries):
             try:
-                response = requests.get(url, stream=True, timeout=30)
-                response.raise_for_status()
+                with self.http.get(url, stream=True, timeout=30) as response:
+                    response.raise_for_status()
 
-                with open(local_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
+                    # Let urllib3 undo any Content-Encoding while copying
+                    response.raw.decode_content = True
+                    with open(partial_path, 'wb') as f:
+                        shutil.copyfileobj(response.raw, f, DOWNLOAD_BUFFER_SIZE)
 
+                partial_path.replace(local_path)
                 return True
 
             except Exception as e:
@@ -344,6 +594,10 @@ async def main():
                        help='Scrape all units in the level')
     parser.add_argument('--no-audio', action='store_true',
                        help='Skip downloading audio files')
+    parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENCY,
+                       help=f'Pages to fetch in parallel (default: {MAX_CONCURRENCY})')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Fetch every page instead of using the page cache')
     parser.add_argument('--db', default=str(DB_PATH),
                        help='Database path (default: data/bbc_learning.db)')
     parser.add_argument('--stats', action='store_true',
@@ -368,7 +622,9 @@ async def main():
         parser.error('Must specify either --unit or --all')
 
     # Run scraper
-    async with BBCScraper(db_path=args.db, download_audio=not args.no_audio) as scraper:
+    async with BBCScraper(db_path=args.db, download_audio=not args.no_audio,
+                          max_concurrency=args.concurrency,
+                          use_cache=not args.no_cache) as scraper:
         if args.unit:
             # Scrape single unit
             await scraper.scrape_unit(args.level, args.unit)
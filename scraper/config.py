@@ -2,6 +2,7 @@
 BBC Learning English Scraper Configuration
 """
 import random
+from functools import lru_cache
 from pathlib import Path
 
 # Base URL
@@ -20,11 +21,20 @@ SESSION_TYPE_PATTERNS = {
     "quiz": ["quiz"],
 }
 
+# Same patterns lower-cased once, in priority order, for detect_session_type
+SESSION_TYPE_KEYWORDS = tuple(
+    (session_type, tuple(keyword.lower() for keyword in keywords))
+    for session_type, keywords in SESSION_TYPE_PATTERNS.items()
+)
+
 # Request settings
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
 MIN_DELAY = 2.0  # seconds
 MAX_DELAY = 5.0  # seconds
 MAX_RETRIES = 3
+MAX_CONCURRENCY = 4  # Pages fetched in parallel
+MAX_DOWNLOADS = 8  # Audio files downloaded in parallel
+PAGE_CACHE_TTL = 7 * 24 * 3600  # seconds a cached page is used without revalidating
 
 # File paths
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -33,6 +43,7 @@ AUDIO_DIR = DATA_DIR / "audio"
 TRANSCRIPT_DIR = DATA_DIR / "transcripts"
 LOG_DIR = PROJECT_ROOT / "logs"
 DB_PATH = DATA_DIR / "bbc_learning.db"
+PAGE_CACHE_PATH = DATA_DIR / "page_cache.db"
 
 # Ensure directories exist
 AUDIO_DIR.mkdir(parents=True, exist_ok=True)
@@ -47,18 +58,30 @@ def get_level_url(level: str) -> str:
     """Get URL for a course level"""
     return f"{BASE_URL}/{level}"
 
+# Unit and downloads page URLs for every unit of every level (at most 30)
+UNIT_URLS = {
+    (level, unit_number): f"{BASE_URL}/{level}/unit-{unit_number}"
+    for level in LEVELS
+    for unit_number in range(1, 31)
+}
+DOWNLOADS_URLS = {key: f"{url}/downloads" for key, url in UNIT_URLS.items()}
+
 def get_unit_url(level: str, unit_number: int) -> str:
     """Get URL for a unit"""
-    return f"{BASE_URL}/{level}/unit-{unit_number}"
+    url = UNIT_URLS.get((level, unit_number))
+    return url if url is not None else f"{BASE_URL}/{level}/unit-{unit_number}"
 
+@lru_cache(maxsize=4096)
 def get_session_url(level: str, unit_number: int, session_number: int) -> str:
     """Get URL for a session"""
-    return f"{BASE_URL}/{level}/unit-{unit_number}/session-{session_number}"
+    return f"{get_unit_url(level, unit_number)}/session-{session_number}"
 
+@lru_cache(maxsize=4096)
 def get_activity_url(level: str, unit_number: int, session_number: int, activity_number: int) -> str:
     """Get URL for an activity"""
-    return f"{BASE_URL}/{level}/unit-{unit_number}/session-{session_number}/activity-{activity_number}"
+    return f"{get_session_url(level, unit_number, session_number)}/activity-{activity_number}"
 
 def get_downloads_url(level: str, unit_number: int) -> str:
     """Get URL for downloads page"""
-    return f"{BASE_URL}/{level}/unit-{unit_number}/downloads"
+    url = DOWNLOADS_URLS.get((level, unit_number))
+    return url if url is not None else f"{get_unit_url(level, unit_number)}/downloads"
@@ -3,23 +3,72 @@ Database writer for BBC Learning English scraper
 """
 import sqlite3
 import json
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Tuple
 from pathlib import Path
 import logging
 
 logger = logging.getLogger(__name__)
 
+# WAL + relaxed sync so a commit doesn't cost a pair of fsyncs
+SQLITE_PRAGMAS = """
+    PRAGMA journal_mode = WAL;
+    PRAGMA synchronous = NORMAL;
+    PRAGMA busy_timeout = 5000;
+    PRAGMA temp_store = MEMORY;
+"""
+
+INSERT_SESSION_VOCABULARY_SQL = """
+    INSERT INTO session_vocabulary
+    (session_id, section_title, word, definition, rule, is_example, sort_order)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_BOLD_WORDS_SQL = """
+    INSERT INTO bold_words (activity_id, word, context_sentence)
+    VALUES (?, ?, ?)
+"""
+
+# Row counts of every scraped table in one statement
+STATS_TABLES = ('units', 'sessions', 'activities', 'session_vocabulary',
+                'bold_words', 'downloads')
+SCRAPING_STATS_SQL = " UNION ALL ".join(
+    f"SELECT '{table}', COUNT(*) FROM {table}" for table in STATS_TABLES
+)
+
 
 class BBCDatabaseWriter:
-    """Handles all database writes for scraped content"""
+    """
+    Handles all database writes for scraped content
+    Inserts are not committed individually; callers commit() once per
+    logical batch (an activity with its vocabulary, a downloads page, ...)
+    """
 
     def __init__(self, db_path: str):
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
+        # check_same_thread=False lets writes run in a worker thread; a
+        # larger statement cache keeps every writer statement prepared
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=512)
         self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SQLITE_PRAGMAS)
+        self.cursor = self.conn.cursor()
+
+        # Every scraped page URL with its table and primary key, loaded once so
+        # url_exists never hits the database and re-inserts can skip the UPSERT
+        self._url_ids: Dict[str, Tuple[str, int]] = {
+            row[0]: (row[1], row[2]) for row in self.conn.execute("""
+                SELECT url, 'units', unit_id FROM units WHERE url IS NOT NULL
+                UNION ALL SELECT url, 'sessions', session_id FROM sessions WHERE url IS NOT NULL
+                UNION ALL SELECT url, 'activities', activity_id FROM activities WHERE url IS NOT NULL
+            """)
+        }
+
+    def commit(self):
+        """Commit pending inserts"""
+        self.conn.commit()
 
     def close(self):
-        """Close database connection"""
+        """Close database connection, committing anything pending"""
+        self.conn.commit()
         self.conn.close()
 
     def __enter__(self):
@@ -32,9 +81,15 @@ class BBCDatabaseWriter:
 
     def insert_unit(self, level_id: str, unit_number: int, title: str,
                     description: str = None, url: str = None, downloads_url: str = None) -> int:
-        """Insert or update a unit, return unit_id"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
+        """
+        Insert or update a unit, return unit_id
+        A unit already stored under url is left as is
+        """
+        unit_id = self._known_id('units', url)
+        if unit_id is not None:
+            return unit_id
+
+        self.cursor.execute("""
             INSERT INTO units (level_id, unit_number, title, description, url, downloads_url)
             VALUES (?, ?, ?, ?, ?, ?)
             ON CONFLICT(level_id, unit_number) DO UPDATE SET
@@ -42,19 +97,17 @@ class BBCDatabaseWriter:
                 description = excluded.description,
                 url = excluded.url,
                 downloads_url = excluded.downloads_url
+            RETURNING unit_id
         """, (level_id, unit_number, title, description, url, downloads_url))
-        self.conn.commit()
-
-        cursor.execute("SELECT unit_id FROM units WHERE level_id = ? AND unit_number = ?",
-                       (level_id, unit_number))
-        return cursor.fetchone()[0]
+        unit_id = self.cursor.fetchone()[0]
+        self._remember(url, 'units', unit_id)
+        return unit_id
 
     def get_unit_id(self, level_id: str, unit_number: int) -> Optional[int]:
         """Get unit_id for a given level and unit number"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT unit_id FROM units WHERE level_id = ? AND unit_number = ?",
-                       (level_id, unit_number))
-        row = cursor.fetchone()
+        self.cursor.execute("SELECT unit_id FROM units WHERE level_id = ? AND unit_number = ?",
+                            (level_id, unit_number))
+        row = self.cursor.fetchone()
         return row[0] if row else None
 
     # ========== Session Operations ==========
@@ -62,9 +115,15 @@ class BBCDatabaseWriter:
     def insert_session(self, unit_id: int, session_number: int, session_type: str,
                        title: str = None, url: str = None, audio_url: str = None,
                        transcript_html: str = None, transcript_text: str = None) -> int:
-        """Insert or update a session, return session_id"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
+        """
+        Insert or update a session, return session_id
+        A session already stored under url is left as is
+        """
+        session_id = self._known_id('sessions', url)
+        if session_id is not None:
+            return session_id
+
+        self.cursor.execute("""
             INSERT INTO sessions (unit_id, session_number, type, title, url, audio_url,
                                  transcript_html, transcript_text)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
@@ -75,20 +134,18 @@ class BBCDatabaseWriter:
                 audio_url = excluded.audio_url,
                 transcript_html = excluded.transcript_html,
                 transcript_text = excluded.transcript_text
+            RETURNING session_id
         """, (unit_id, session_number, session_type, title, url, audio_url,
               transcript_html, transcript_text))
-        self.conn.commit()
-
-        cursor.execute("SELECT session_id FROM sessions WHERE unit_id = ? AND session_number = ?",
-                       (unit_id, session_number))
-        return cursor.fetchone()[0]
+        session_id = self.cursor.fetchone()[0]
+        self._remember(url, 'sessions', session_id)
+        return session_id
 
     def get_session_id(self, unit_id: int, session_number: int) -> Optional[int]:
         """Get session_id for a given unit and session number"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT session_id FROM sessions WHERE unit_id = ? AND session_number = ?",
-                       (unit_id, session_number))
-        row = cursor.fetchone()
+        self.cursor.execute("SELECT session_id FROM sessions WHERE unit_id = ? AND session_number = ?",
+                            (unit_id, session_number))
+        row = self.cursor.fetchone()
         return row[0] if row else None
 
     # ========== Activity Operations ==========
@@ -98,9 +155,15 @@ class BBCDatabaseWriter:
                         content_text: str = None, has_audio: bool = False, audio_url: str = None,
                         has_transcript: bool = False, transcript_html: str = None,
                         transcript_text: str = None) -> int:
-        """Insert or update an activity, return activity_id"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
+        """
+        Insert or update an activity, return activity_id
+        An activity already stored under url is left as is
+        """
+        activity_id = self._known_id('activities', url)
+        if activity_id is not None:
+            return activity_id
+
+        self.cursor.execute("""
             INSERT INTO activities (session_id, activity_number, title, instruction, url,
                                    content_html, content_text, has_audio, audio_url,
                                    has_transcript, transcript_html, transcript_text)
@@ -116,30 +179,23 @@ class BBCDatabaseWriter:
                 has_transcript = excluded.has_transcript,
                 transcript_html = excluded.transcript_html,
                 transcript_text = excluded.transcript_text
+            RETURNING activity_id
         """, (session_id, activity_number, title, instruction, url, content_html, content_text,
               has_audio, audio_url, has_transcript, transcript_html, transcript_text))
-        self.conn.commit()
-
-        cursor.execute("SELECT activity_id FROM activities WHERE session_id = ? AND activity_number = ?",
-                       (session_id, activity_number))
-        return cursor.fetchone()[0]
+        activity_id = self.cursor.fetchone()[0]
+        self._remember(url, 'activities', activity_id)
+        return activity_id
 
     # ========== Vocabulary Operations ==========
 
     def insert_session_vocabulary(self, session_id: int, items: List[Dict[str, Any]]):
         """Insert session vocabulary items"""
-        cursor = self.conn.cursor()
-
         # Clear existing vocabulary for this session
-        cursor.execute("DELETE FROM session_vocabulary WHERE session_id = ?", (session_id,))
+        self.cursor.execute("DELETE FROM session_vocabulary WHERE session_id = ?", (session_id,))
 
         # Insert new items
-        for i, item in enumerate(items):
-            cursor.execute("""
-                INSERT INTO session_vocabulary
-                (session_id, section_title, word, definition, rule, is_example, sort_order)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
+        self.cursor.executemany(INSERT_SESSION_VOCABULARY_SQL, (
+            (
                 session_id,
                 item.get('section_title'),
                 item.get('word'),
@@ -147,25 +203,20 @@ class BBCDatabaseWriter:
                 item.get('rule'),
                 item.get('is_example', False),
                 i
-            ))
-
-        self.conn.commit()
+            )
+            for i, item in enumerate(items)
+        ))
 
     def insert_bold_words(self, activity_id: int, words: List[Dict[str, str]]):
         """Insert bold words from activity content"""
-        cursor = self.conn.cursor()
-
         # Clear existing bold words for this activity
-        cursor.execute("DELETE FROM bold_words WHERE activity_id = ?", (activity_id,))
+        self.cursor.execute("DELETE FROM bold_words WHERE activity_id = ?", (activity_id,))
 
         # Insert new words
-        for word_data in words:
-            cursor.execute("""
-                INSERT INTO bold_words (activity_id, word, context_sentence)
-                VALUES (?, ?, ?)
-            """, (activity_id, word_data.get('word'), word_data.get('context')))
-
-        self.conn.commit()
+        self.cursor.executemany(INSERT_BOLD_WORDS_SQL, (
+            (activity_id, word_data.get('word'), word_data.get('context'))
+            for word_data in words
+        ))
 
     # ========== Downloads Operations ==========
 
@@ -174,39 +225,31 @@ class BBCDatabaseWriter:
                         transcript_url: str = None, local_audio_path: str = None,
                         local_transcript_path: str = None) -> int:
         """Insert a download resource"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
+        self.cursor.execute("""
             INSERT INTO downloads
             (unit_id, resource_title, session_number, activity_number, audio_url, audio_size,
              transcript_url, local_audio_path, local_transcript_path)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (unit_id, resource_title, session_number, activity_number, audio_url, audio_size,
               transcript_url, local_audio_path, local_transcript_path))
-        self.conn.commit()
-        return cursor.lastrowid
+        return self.cursor.lastrowid
 
     def url_exists(self, url: str) -> bool:
-        """Check if a URL has already been scraped"""
-        cursor = self.conn.cursor()
+        """Check if a URL has already been scraped (as a unit, session or activity)"""
+        return url in self._url_ids
 
-        # Check in units, sessions, and activities
-        for table in ['units', 'sessions', 'activities']:
-            cursor.execute(f"SELECT 1 FROM {table} WHERE url = ? LIMIT 1", (url,))
-            if cursor.fetchone():
-                return True
+    def _known_id(self, table: str, url: Optional[str]) -> Optional[int]:
+        """Primary key of the row already stored in table under url, if any"""
+        entry = self._url_ids.get(url) if url else None
+        if entry and entry[0] == table:
+            return entry[1]
+        return None
 
-        return False
+    def _remember(self, url: Optional[str], table: str, row_id: int):
+        """Record a URL stored in units, sessions or activities"""
+        if url:
+            self._url_ids[url] = (table, row_id)
 
     def get_scraping_stats(self) -> Dict[str, int]:
         """Get statistics about scraped content"""
-        cursor = self.conn.cursor()
-
-        stats = {}
-        tables = ['units', 'sessions', 'activities', 'session_vocabulary',
-                  'bold_words', 'downloads']
-
-        for table in tables:
-            cursor.execute(f"SELECT COUNT(*) FROM {table}")
-            stats[table] = cursor.fetchone()[0]
-
-        return stats
+        return dict(self.cursor.execute(SCRAPING_STATS_SQL).fetchall())
@@ -0,0 +1,64 @@
+"""
+Page cache for BBC Learning English scraper
+Keeps fetched HTML so re-runs (and runs restarted after a crash) don't
+download unchanged pages again
+"""
+import sqlite3
+import time
+from typing import Optional, Dict, Any
+
+from scraper.config import PAGE_CACHE_PATH, PAGE_CACHE_TTL
+
+
+class PageCache:
+    """URL-keyed HTML cache with the validators needed for conditional GETs"""
+
+    def __init__(self, db_path: str = str(PAGE_CACHE_PATH)):
+        # Kept out of bbc_learning.db so the shipped database doesn't grow
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body TEXT NOT NULL,
+                fetched_at INTEGER NOT NULL
+            );
+        """)
+
+    def close(self):
+        """Close cache database"""
+        self.conn.close()
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached page"""
+        row = self.conn.execute(
+            "SELECT body, etag, last_modified, fetched_at FROM http_cache WHERE url = ?", (url,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    @staticmethod
+    def is_fresh(entry: Dict[str, Any], max_age: int = PAGE_CACHE_TTL) -> bool:
+        """Whether a cached page can be used without revalidating it"""
+        return time.time() - entry['fetched_at'] < max_age
+
+    def set(self, url: str, body: str, etag: Optional[str] = None,
+            last_modified: Optional[str] = None):
+        """Store a fetched page"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO http_cache (url, etag, last_modified, body, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body, int(time.time()))
+            )
+
+    def touch(self, url: str):
+        """Mark a cached page as revalidated (the server answered 304)"""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE http_cache SET fetched_at = ? WHERE url = ?", (int(time.time()), url)
+            )
@@ -3,13 +3,148 @@ HTML parsers for BBC Learning English pages
 """
 import re
 from typing import List, Dict, Any, Optional, Tuple
-from bs4 import BeautifulSoup, Tag
 import logging
 
-from scraper.config import SESSION_TYPE_PATTERNS
+import lxml.html
+from lxml import etree
+
+from scraper.config import SESSION_TYPE_KEYWORDS
 
 logger = logging.getLogger(__name__)
 
+# Text nodes as BeautifulSoup's get_text() sees them (no script/style contents)
+_TEXT_NODES = etree.XPath('.//text()[not(ancestor::script or ancestor::style or ancestor::template)]')
+
+
+def _parse_html(html: str) -> lxml.html.HtmlElement:
+    """Parse a page into an lxml tree (always rooted at <html>)"""
+    if not html or not html.strip():
+        html = '<html></html>'
+    return lxml.html.document_fromstring(html)
+
+
+def _text(elem: lxml.html.HtmlElement, separator: str = '') -> str:
+    """Stripped text of an element; same result as Tag.get_text(separator, strip=True)"""
+    return separator.join(text for text in (node.strip() for node in _TEXT_NODES(elem)) if text)
+
+
+def _outer_html(elem: lxml.html.HtmlElement) -> str:
+    """Serialize an element without its trailing text"""
+    return lxml.html.tostring(elem, encoding='unicode', with_tail=False)
+
+
+def _string(elem: lxml.html.HtmlElement) -> Optional[str]:
+    """Text of an element whose only content is a single string, as Tag.string"""
+    while True:
+        children = list(elem)
+        if not children:
+            return elem.text or None
+        if len(children) > 1 or elem.text or children[0].tail:
+            return None
+        elem = children[0]
+
+
+def _class_selector(name: str) -> str:
+    """XPath equivalent of the CSS selector .name"""
+    return f"//*[contains(concat(' ', normalize-space(@class), ' '), ' {name} ')]"
+
+
+def _select_first(root: lxml.html.HtmlElement,
+                  xpaths: List[etree.XPath]) -> Optional[lxml.html.HtmlElement]:
+    """First element matched by the earliest xpath in the list that matches anything"""
+    for xpath in xpaths:
+        found = xpath(root)
+        if found:
+            return found[0]
+    return None
+
+
+def _matches(elem: lxml.html.HtmlElement, attr: str, value: str, exact: bool) -> bool:
+    """Whether elem matches the CSS selector .value / #value (exact) or [attr*="value"]"""
+    attr_value = elem.get(attr)
+    if attr_value is None:
+        return False
+    if not exact:
+        return value in attr_value
+    return value in attr_value.split() if attr == 'class' else attr_value == value
+
+
+def _candidates_xpath(selectors: Tuple[Tuple[str, str, bool], ...]) -> etree.XPath:
+    """One XPath finding every element that any of the selectors could pick"""
+    terms = dict.fromkeys(
+        f"@{attr}='{value}'" if attr == 'id' and exact else f"contains(@{attr}, '{value}')"
+        for attr, value, exact in selectors
+    )
+    return etree.XPath(f"//*[{' or '.join(terms)}]")
+
+
+def _select_best(candidates: List[lxml.html.HtmlElement],
+                 selectors: Tuple[Tuple[str, str, bool], ...]) -> Optional[lxml.html.HtmlElement]:
+    """First candidate matched by the earliest selector that matches anything"""
+    for attr, value, exact in selectors:
+        for elem in candidates:
+            if _matches(elem, attr, value, exact):
+                return elem
+    return None
+
+
+# Containers tried in order, as the CSS selectors
+# .transcript, #transcript, [class*="transcript"], [id*="transcript"]
+# The candidates are collected in a single walk of the tree, then ranked
+TRANSCRIPT_SELECTORS = (
+    ('class', 'transcript', True),
+    ('id', 'transcript', True),
+    ('class', 'transcript', False),
+    ('id', 'transcript', False),
+)
+_TRANSCRIPT_CANDIDATES = _candidates_xpath(TRANSCRIPT_SELECTORS)
+
+# .vocabulary, #vocabulary, [class*="vocabulary"], .sidebar, [class*="sidebar"]
+VOCAB_SELECTORS = (
+    ('class', 'vocabulary', True),
+    ('id', 'vocabulary', True),
+    ('class', 'vocabulary', False),
+    ('class', 'sidebar', True),
+    ('class', 'sidebar', False),
+)
+_VOCAB_CANDIDATES = _candidates_xpath(VOCAB_SELECTORS)
+
+# Links and emphasis, in document order
+_LINKS = etree.XPath('//a[@href]')
+_BOLD_TAGS = etree.XPath('.//b | .//strong')
+_VOCAB_ITEMS = etree.XPath('.//li | .//p')
+
+# <div>/<li> whose class contains download or resource, as
+# find_all(['div', 'li'], class_=re.compile(r'download|resource'))
+_DOWNLOAD_SECTIONS = etree.XPath(
+    "//*[self::div or self::li]"
+    "[contains(@class, 'download') or contains(@class, 'resource')]"
+)
+_DOWNLOAD_TITLE = etree.XPath('.//*[self::h3 or self::h4 or self::strong]')
+_DOWNLOAD_AUDIO_LINK = etree.XPath(".//a[contains(@href, '.mp3')]")
+_DOWNLOAD_LINKS = etree.XPath('.//a')
+
+# Regular expressions, compiled once
+_SESSION_LINK_RE = re.compile(r'/session-(\d+)$')
+_ACTIVITY_LINK_RE = re.compile(r'/activity-(\d+)$')
+_RULE_SPLIT_RE = re.compile(r'[→—]')
+_SESSION_NUM_RE = re.compile(r'Session\s+(\d+)', re.I)
+_ACTIVITY_NUM_RE = re.compile(r'Activity\s+(\d+)', re.I)
+_SIZE_RE = re.compile(r'([\d.]+\s*[KMG]B)', re.I)
+_TRANSCRIPT_RE = re.compile(r'transcript', re.I)
+
+# .instruction, [class*="instruction"], p
+INSTRUCTION_XPATHS = [
+    etree.XPath(_class_selector('instruction')),
+    etree.XPath("//*[contains(@class, 'instruction')]"),
+    etree.XPath("//p"),
+]
+
+# Activity page title, main content container and linked files
+_TITLE_TAGS = etree.XPath('//h1 | //h2')
+MAIN_CONTENT_XPATHS = [etree.XPath('//main'), etree.XPath('//article'), etree.XPath('//body')]
+_LINK_HREFS = etree.XPath('//a/@href')
+
 
 class BBCParser:
     """Parse BBC Learning English pages"""
@@ -20,20 +155,18 @@ class BBCParser:
         Extract all session links from a unit page
         Returns: [{"session_number": 1, "url": "...", "title": "..."}, ...]
         """
-        soup = BeautifulSoup(html, 'lxml')
+        root = _parse_html(html)
         sessions = []
 
         # Look for session links (pattern: /session-{N})
-        session_pattern = re.compile(r'/session-(\d+)$')
-
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            match = session_pattern.search(href)
+        for link in _LINKS(root):
+            href = link.get('href')
+            match = _SESSION_LINK_RE.search(href)
 
             if match:
                 session_number = int(match.group(1))
                 full_url = href if href.startswith('http') else f"{base_url}{href}"
-                title = link.get_text(strip=True)
+                title = _text(link)
 
                 sessions.append({
                     'session_number': session_number,
@@ -53,20 +186,18 @@ class BBCParser:
         Extract all activity links from a session page
         Returns: [{"activity_number": 1, "url": "...", "title": "..."}, ...]
         """
-        soup = BeautifulSoup(html, 'lxml')
+        root = _parse_html(html)
         activities = []
 
         # Look for activity links (pattern: /activity-{K})
-        activity_pattern = re.compile(r'/activity-(\d+)$')
-
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            match = activity_pattern.search(href)
+        for link in _LINKS(root):
+            href = link.get('href')
+            match = _ACTIVITY_LINK_RE.search(href)
 
             if match:
                 activity_number = int(match.group(1))
                 full_url = href if href.startswith('http') else f"{base_url}{href}"
-                title = link.get_text(strip=True)
+                title = _text(link)
 
                 activities.append({
                     'activity_number': activity_number,
@@ -86,10 +217,13 @@ class BBCParser:
         Detect session type from page content
         Returns: 'vocabulary', 'grammar', 'reading', 'listening', 'drama', 'quiz', or 'unknown'
         """
-        content = f"{title} {html}".lower()
+        # Title and page are scanned separately rather than concatenated,
+        # saving a copy of the whole page per call
+        title = title.lower()
+        html = html.lower()
 
-        for session_type, keywords in SESSION_TYPE_PATTERNS.items():
-            if any(keyword.lower() in content for keyword in keywords):
+        for session_type, keywords in SESSION_TYPE_KEYWORDS:
+            if any(keyword in title or keyword in html for keyword in keywords):
                 return session_type
 
         logger.warning(f"Could not determine session type from content")
@@ -101,46 +235,41 @@ class BBCParser:
         Extract transcript HTML and text
         Returns: (transcript_html, transcript_text)
         """
-        soup = BeautifulSoup(html, 'lxml')
+        return BBCParser._transcript_from_tree(_parse_html(html))
 
+    @staticmethod
+    def _transcript_from_tree(root: lxml.html.HtmlElement) -> Tuple[Optional[str], Optional[str]]:
+        """extract_transcript on an already parsed page"""
         # Look for transcript container (various possible class names)
-        transcript_selectors = [
-            '.transcript',
-            '#transcript',
-            '[class*="transcript"]',
-            '[id*="transcript"]'
-        ]
-
-        transcript_elem = None
-        for selector in transcript_selectors:
-            transcript_elem = soup.select_one(selector)
-            if transcript_elem:
-                break
-
-        if not transcript_elem:
+        transcript_elem = _select_best(_TRANSCRIPT_CANDIDATES(root), TRANSCRIPT_SELECTORS)
+
+        if transcript_elem is None:
             return None, None
 
-        transcript_html = str(transcript_elem)
-        transcript_text = transcript_elem.get_text(separator='\n', strip=True)
+        transcript_html = _outer_html(transcript_elem)
+        transcript_text = _text(transcript_elem, separator='\n')
 
         return transcript_html, transcript_text
 
     @staticmethod
     def extract_audio_url(html: str) -> Optional[str]:
         """Extract audio MP3 URL from page"""
-        soup = BeautifulSoup(html, 'lxml')
+        return BBCParser._audio_url_from_tree(_parse_html(html))
 
+    @staticmethod
+    def _audio_url_from_tree(root: lxml.html.HtmlElement) -> Optional[str]:
+        """extract_audio_url on an already parsed page"""
         # Look for audio elements
-        audio_elem = soup.find('audio')
-        if audio_elem:
-            source = audio_elem.find('source')
-            if source and source.get('src'):
-                return source['src']
+        audio_elem = root.find('.//audio')
+        if audio_elem is not None:
+            source = audio_elem.find('.//source')
+            if source is not None and source.get('src'):
+                return source.get('src')
 
         # Look for download links
-        for link in soup.find_all('a', href=True):
-            if '.mp3' in link['href']:
-                return link['href']
+        for href in _LINK_HREFS(root):
+            if '.mp3' in href:
+                return str(href)
 
         return None
 
@@ -150,18 +279,26 @@ class BBCParser:
         Extract bold words from content with context
         Returns: [{"word": "...", "context": "..."}, ...]
         """
-        soup = BeautifulSoup(html, 'lxml')
+        return BBCParser._bold_words_from_tree(_parse_html(html))
+
+    @staticmethod
+    def _bold_words_from_tree(root: lxml.html.HtmlElement) -> List[Dict[str, str]]:
+        """extract_bold_words on an already parsed page or element"""
         bold_words = []
+        # A paragraph with several bold words is only turned into text once
+        parent_contexts = {}
 
-        for tag in soup.find_all(['b', 'strong']):
-            word = tag.get_text(strip=True)
+        for tag in _BOLD_TAGS(root):
+            word = _text(tag)
             if not word:
                 continue
 
             # Get parent sentence as context
-            parent = tag.parent
-            if parent:
-                context = parent.get_text(strip=True)
+            parent = tag.getparent()
+            if parent is not None:
+                context = parent_contexts.get(parent)
+                if context is None:
+                    context = parent_contexts[parent] = _text(parent)
             else:
                 context = word
 
@@ -184,47 +321,37 @@ class BBCParser:
         Format B (word definitions):
         [{"word": "...", "definition": "..."}, ...]
         """
-        soup = BeautifulSoup(html, 'lxml')
+        return BBCParser._session_vocabulary_from_tree(_parse_html(html))
+
+    @staticmethod
+    def _session_vocabulary_from_tree(root: lxml.html.HtmlElement) -> List[Dict[str, Any]]:
+        """extract_session_vocabulary on an already parsed page"""
         vocabulary = []
 
         # Look for vocabulary sidebar (various possible selectors)
-        vocab_selectors = [
-            '.vocabulary',
-            '#vocabulary',
-            '[class*="vocabulary"]',
-            '.sidebar',
-            '[class*="sidebar"]'
-        ]
-
-        vocab_container = None
-        for selector in vocab_selectors:
-            vocab_container = soup.select_one(selector)
-            if vocab_container:
-                break
-
-        if not vocab_container:
+        vocab_container = _select_best(_VOCAB_CANDIDATES(root), VOCAB_SELECTORS)
+
+        if vocab_container is None:
             return []
 
         # Try to detect format and extract accordingly
         # Format A: Rules with examples (grammar/vocabulary sessions)
-        rule_items = vocab_container.find_all(['li', 'p'])
-
-        for item in rule_items:
-            text = item.get_text(strip=True)
+        for item in _VOCAB_ITEMS(vocab_container):
+            text = _text(item)
             if not text:
                 continue
 
             # Check if it contains a rule pattern (e.g., "adjective + noun")
             if '→' in text or '—' in text or '+' in text:
                 # Format A: rule → example
-                parts = re.split(r'[→—]', text, 1)
-                if len(parts) == 2:
-                    rule = parts[0].strip()
-                    example_text = parts[1].strip()
+                separator = _RULE_SPLIT_RE.search(text)
+                if separator:
+                    rule = text[:separator.start()].strip()
+                    example_text = text[separator.end():].strip()
 
                     # Extract bold example
-                    bold = item.find(['b', 'strong'])
-                    example = bold.get_text(strip=True) if bold else example_text
+                    bolds = _BOLD_TAGS(item)
+                    example = _text(bolds[0]) if bolds else example_text
 
                     vocabulary.append({
                         'rule': rule,
@@ -232,29 +359,30 @@ class BBCParser:
                         'is_example': True
                     })
             else:
-                # Format B: word — definition
-                parts = re.split(r'[—–]', text, 1)
-                if len(parts) == 2:
-                    word = parts[0].strip()
-                    definition = parts[1].strip()
+                # Format B: word – definition (an em dash would have made it format A)
+                word, dash, definition = text.partition('–')
+                if dash:
+                    word = word.strip()
+                    definition = definition.strip()
 
                     # Remove ** markdown if present
-                    word = re.sub(r'\*\*', '', word)
-
-                    vocabulary.append({
-                        'word': word,
-                        'definition': definition
-                    })
-                elif item.find(['b', 'strong']):
-                    # Word is bold, rest is definition
-                    bold = item.find(['b', 'strong'])
-                    word = bold.get_text(strip=True)
-                    definition = text.replace(word, '').strip()
+                    word = word.replace('**', '')
 
                     vocabulary.append({
                         'word': word,
                         'definition': definition
                     })
+                else:
+                    bolds = _BOLD_TAGS(item)
+                    if bolds:
+                        # Word is bold, rest is definition
+                        word = _text(bolds[0])
+                        definition = text.replace(word, '').strip()
+
+                        vocabulary.append({
+                            'word': word,
+                            'definition': definition
+                        })
 
         return vocabulary
 
@@ -276,41 +404,42 @@ class BBCParser:
             "bold_words": List[Dict]
         }
         """
-        soup = BeautifulSoup(html, 'lxml')
+        root = _parse_html(html)
 
         # Extract title
-        title_elem = soup.find(['h1', 'h2'])
-        title = title_elem.get_text(strip=True) if title_elem else ""
+        title_elems = _TITLE_TAGS(root)
+        title = _text(title_elems[0]) if title_elems else ""
 
         # Extract instruction
         instruction = ""
-        instruction_selectors = ['.instruction', '[class*="instruction"]', 'p']
-        for selector in instruction_selectors:
-            elem = soup.select_one(selector)
-            if elem:
-                text = elem.get_text(strip=True)
+        for xpath in INSTRUCTION_XPATHS:
+            found = xpath(root)
+            if found:
+                text = _text(found[0])
                 if any(keyword in text.lower() for keyword in ['listen', 'read', 'complete']):
                     instruction = text
                     break
 
         # Extract main content (excluding transcript and sidebar)
-        main_content = soup.find('main') or soup.find('article') or soup.find('body')
-        content_html = str(main_content) if main_content else html
-        content_text = main_content.get_text(separator='\n', strip=True) if main_content else ""
+        main_content = _select_first(root, MAIN_CONTENT_XPATHS)
+        content_html = _outer_html(main_content) if main_content is not None else html
+        content_text = _text(main_content, separator='\n') if main_content is not None else ""
+
+        # The sub-extractors share this one parsed tree
 
         # Extract audio
-        audio_url = BBCParser.extract_audio_url(html)
+        audio_url = BBCParser._audio_url_from_tree(root)
         has_audio = bool(audio_url)
 
         # Extract transcript
-        transcript_html, transcript_text = BBCParser.extract_transcript(html)
+        transcript_html, transcript_text = BBCParser._transcript_from_tree(root)
         has_transcript = bool(transcript_html)
 
         # Extract session vocabulary
-        session_vocabulary = BBCParser.extract_session_vocabulary(html)
+        session_vocabulary = BBCParser._session_vocabulary_from_tree(root)
 
-        # Extract bold words
-        bold_words = BBCParser.extract_bold_words(content_html)
+        # Extract bold words (from the main content only)
+        bold_words = BBCParser._bold_words_from_tree(main_content if main_content is not None else root)
 
         return {
             'title': title,
@@ -339,24 +468,24 @@ class BBCParser:
             "transcript_url": str
         }, ...]
         """
-        soup = BeautifulSoup(html, 'lxml')
+        root = _parse_html(html)
         downloads = []
 
         # Look for download sections
-        download_sections = soup.find_all(['div', 'li'], class_=re.compile(r'download|resource'))
+        download_sections = _DOWNLOAD_SECTIONS(root)
 
         for section in download_sections:
             resource = {}
 
             # Extract title
-            title_elem = section.find(['h3', 'h4', 'strong'])
-            if title_elem:
-                resource['resource_title'] = title_elem.get_text(strip=True)
+            title_elems = _DOWNLOAD_TITLE(section)
+            if title_elems:
+                resource['resource_title'] = _text(title_elems[0])
 
             # Extract session/activity numbers from title or metadata
-            text = section.get_text()
-            session_match = re.search(r'Session\s+(\d+)', text, re.I)
-            activity_match = re.search(r'Activity\s+(\d+)', text, re.I)
+            text = ''.join(_TEXT_NODES(section))
+            session_match = _SESSION_NUM_RE.search(text)
+            activity_match = _ACTIVITY_NUM_RE.search(text)
 
             if session_match:
                 resource['session_number'] = int(session_match.group(1))
@@ -364,18 +493,22 @@ class BBCParser:
                 resource['activity_number'] = int(activity_match.group(1))
 
             # Extract audio download link
-            audio_link = section.find('a', href=re.compile(r'\.mp3'))
-            if audio_link:
-                resource['audio_url'] = audio_link['href']
+            audio_links = _DOWNLOAD_AUDIO_LINK(section)
+            if audio_links:
+                audio_link = audio_links[0]
+                resource['audio_url'] = audio_link.get('href')
                 # Extract file size if present
-                size_text = audio_link.get_text()
-                size_match = re.search(r'([\d.]+\s*[KMG]B)', size_text, re.I)
+                size_text = ''.join(_TEXT_NODES(audio_link))
+                size_match = _SIZE_RE.search(size_text)
                 if size_match:
                     resource['audio_size'] = size_match.group(1)
 
             # Extract transcript download link
-            transcript_link = section.find('a', text=re.compile(r'transcript', re.I))
-            if transcript_link:
+            transcript_link = next((
+                link for link in _DOWNLOAD_LINKS(section)
+                if _TRANSCRIPT_RE.search(_string(link) or '')
+            ), None)
+            if transcript_link is not None:
                 resource['transcript_url'] = transcript_link.get('href')
 
             if resource.get('resource_title'):
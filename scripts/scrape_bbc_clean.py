@@ -1,20 +1,31 @@
 #!/usr/bin/env python3
 """
 Clean BBC Learning English scraper v2
-- Pure requests + BeautifulSoup (no Playwright needed)
+- Pure requests + lxml (no Playwright needed)
+- Pages of a unit fetched in parallel, throttled to a fixed request rate
+- Fetched pages cached on disk for a week, so reruns don't refetch
+- Per-unit JSON keeps transcript/content HTML in separate .html files
 - Transcripts are in the HTML source, hidden by CSS class 'hide'
 - Content split across activity-1, activity-2, activity-3 per session
 - Audio from downloads page + individual activity pages
 - Correct TYPE_MAP for S3/S4 (varies by unit)
 """
-import json
+import argparse
+import hashlib
+import html as html_lib
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
+import lxml.html
+import orjson
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree
 
 BASE = "https://www.bbc.co.uk/learningenglish/course/intermediate"
 DL_BASE = "https://www.bbc.co.uk/learningenglish/english/course/intermediate"
@@ -25,6 +36,39 @@ HEADERS = {
 OUT_DIR = Path(__file__).parent.parent / "data" / "units"
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
+CACHE_DIR = Path(__file__).parent.parent / ".cache" / "bbc"
+CACHE_MAX_AGE = 7 * 24 * 3600  # seconds a cached page is reused
+FORCE_REFRESH = False  # set by --force-refresh
+
+MAX_WORKERS = 4  # pages of a unit fetched in parallel
+REQUESTS_PER_SECOND = 2.0  # across all workers; override with --rate
+
+# Audio/PDF links anywhere in a page's HTML (the audio one runs on raw bytes)
+AUDIO_LINK_RE = re.compile(rb'https?://[^"\s\'<>]+\.mp3')
+DOWNLOAD_URL_RE = re.compile(r"https?://[^\"\s']+\.(?P<ext>mp3|pdf)")
+
+# Pages are served as UTF-8
+HTML_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+
+
+def has_class(name: str) -> str:
+    """XPath test for `name` being one of an element's class names."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Queries for the page widgets, in document order
+HIDEABLE_WIDGET = etree.XPath(f"//div[{has_class('widget-richtext-hideable')}]")
+RICHTEXT_DIV = etree.XPath(f".//div[{has_class('widget-richtext')}]")
+STANDALONE_RICHTEXT_DIVS = etree.XPath(
+    f"//div[{has_class('widget-richtext')}][not(ancestor::*[{has_class('widget-richtext-hideable')}])]"
+)
+UNIT_TITLE_SPAN = etree.XPath(f"//span[{has_class('bbcle-unit-title')}]")
+KEYWORD_TAGS = etree.XPath(".//strong | .//b")
+AUDIO_SOURCES = etree.XPath(
+    "//audio[contains(@src, '.mp3')]/@src | //audio//source[contains(@src, '.mp3')]/@src"
+)
+TEXT_NODES = etree.XPath(".//text()[not(ancestor::script or ancestor::style or ancestor::template)]")
+
 # Correct session type mapping per unit
 # S1 = vocabulary, S2 = grammar (always)
 # S3/S4 vary by unit (reading/listening swap)
@@ -52,12 +96,40 @@ TYPE_MAP = {
 }
 
 
-def fetch(url: str) -> Optional[BeautifulSoup]:
-    """Fetch a URL and return parsed soup, or None on failure."""
+class Throttle:
+    """Spaces requests evenly across threads, at most `rate` per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        time.sleep(slot - now)
+
+
+# One keep-alive connection pool shared by all worker threads; rate limiting
+# and server errors are retried with backoff inside the adapter
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(
+    pool_maxsize=MAX_WORKERS,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+))
+THROTTLE = Throttle(REQUESTS_PER_SECOND)
+
+
+def get(url: str) -> Optional[requests.Response]:
+    """GET a URL and return the response if it is a 200, or None on failure."""
+    THROTTLE.wait()
     try:
-        r = requests.get(url, headers=HEADERS, timeout=30)
+        r = SESSION.get(url, timeout=30)
         if r.status_code == 200:
-            return BeautifulSoup(r.text, "html.parser")
+            return r
         print(f"    HTTP {r.status_code}: {url}")
         return None
     except Exception as e:
@@ -65,94 +137,151 @@ def fetch(url: str) -> Optional[BeautifulSoup]:
         return None
 
 
-def extract_transcript(soup: BeautifulSoup) -> Optional[str]:
-    """Extract transcript from a hideable widget."""
-    widget = soup.find("div", class_="widget-richtext-hideable")
-    if not widget:
-        return None
-    content_div = widget.find("div", class_="widget-richtext")
-    if not content_div:
+def fetch_content(url: str) -> Optional[bytes]:
+    """Fetch a URL's body, from the disk cache while fresh, or None on failure."""
+    path = CACHE_DIR / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.html"
+    if not FORCE_REFRESH:
+        try:
+            if time.time() - path.stat().st_mtime < CACHE_MAX_AGE:
+                return path.read_bytes()
+        except FileNotFoundError:
+            pass
+
+    r = get(url)
+    if r is None:
         return None
-    html = content_div.decode_contents().strip()
+
+    # Written under a temporary name so a partial file is never read back;
+    # the name is per thread as two workers may fetch the same page at once
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    partial_path = path.with_suffix(f".{threading.get_ident()}.part")
+    partial_path.write_bytes(r.content)
+    partial_path.replace(path)
+    return r.content
+
+
+def parse(content: bytes) -> lxml.html.HtmlElement:
+    """Parse a fetched page."""
+    # Raw bytes: the parser decodes them itself, skipping a str copy
+    try:
+        return lxml.html.document_fromstring(content, parser=HTML_PARSER)
+    except etree.ParserError:
+        # Empty (or comment-only) body: a page with nothing on it, not a crash
+        return lxml.html.document_fromstring(b"<html></html>", parser=HTML_PARSER)
+
+
+def fetch(url: str) -> Optional[lxml.html.HtmlElement]:
+    """Fetch a URL and return the parsed page, or None on failure."""
+    content = fetch_content(url)
+    return parse(content) if content is not None else None
+
+
+def fetch_text(url: str) -> Optional[str]:
+    """Fetch a URL and return its unparsed HTML, or None on failure."""
+    content = fetch_content(url)
+    return content.decode("utf-8", errors="replace") if content is not None else None
+
+
+def text_of(elem: lxml.html.HtmlElement) -> str:
+    """Stripped text of an element (same as BeautifulSoup's get_text(strip=True))."""
+    return "".join(part.strip() for part in TEXT_NODES(elem))
+
+
+def inner_html(elem: lxml.html.HtmlElement) -> str:
+    """Serialize the contents of an element, without the element itself."""
+    return html_lib.escape(elem.text or "", quote=False) + "".join(
+        lxml.html.tostring(child, encoding="unicode") for child in elem
+    )
+
+
+def bold_texts(elem: lxml.html.HtmlElement) -> list[str]:
+    """Text of the bold/strong tags inside an element."""
+    return [text_of(tag) for tag in KEYWORD_TAGS(elem)]
+
+
+def extract_transcript(tree: lxml.html.HtmlElement) -> Tuple[Optional[str], list[str]]:
+    """Extract transcript from a hideable widget, with its bold text."""
+    widgets = HIDEABLE_WIDGET(tree)
+    if not widgets:
+        return None, []
+    content_divs = RICHTEXT_DIV(widgets[0])
+    if not content_divs:
+        return None, []
+    html = inner_html(content_divs[0]).strip()
     if len(html) < 50:
-        return None
-    return html
+        return None, []
+    return html, bold_texts(content_divs[0])
 
 
-def extract_richtext_blocks(soup: BeautifulSoup) -> list[str]:
-    """Extract standalone richtext blocks (not inside hideable)."""
+def extract_richtext_blocks(tree: lxml.html.HtmlElement) -> Tuple[list[str], list[str]]:
+    """Extract standalone richtext blocks (not inside hideable), with their bold text."""
     blocks = []
-    for rt in soup.find_all("div", class_="widget-richtext"):
-        if rt.find_parent(class_="widget-richtext-hideable"):
-            continue
-        html = rt.decode_contents().strip()
+    bold = []
+    for rt in STANDALONE_RICHTEXT_DIVS(tree):
+        html = inner_html(rt).strip()
         if len(html) > 50:
             blocks.append(html)
-    return blocks
-
-
-def extract_keywords_from_html(html: str) -> list[str]:
-    """Extract keywords from bold/strong tags in content."""
-    soup = BeautifulSoup(html, "html.parser")
-    keywords = []
-    for tag in soup.find_all(["strong", "b"]):
-        text = tag.get_text(strip=True)
-        if text and len(text) > 1 and len(text) < 100:
-            keywords.append(text)
-    return keywords
-
-
-def extract_audio_from_page(soup: BeautifulSoup) -> list[str]:
-    """Extract audio URLs from a page (audio elements + mp3 links in HTML)."""
-    urls = []
-    # Check <audio> elements
-    for audio in soup.find_all("audio"):
-        src = audio.get("src", "")
-        if src and ".mp3" in src:
-            urls.append(src)
-        for source in audio.find_all("source"):
-            src = source.get("src", "")
-            if src and ".mp3" in src:
-                urls.append(src)
+            bold.extend(bold_texts(rt))
+    return blocks, bold
+
+
+def extract_keywords(texts: list[str]) -> list[str]:
+    """Keywords from bold/strong text, deduplicated ignoring case."""
+    keywords = {}
+    for text in texts:
+        if len(text) > 1 and len(text) < 100:
+            keywords.setdefault(text.lower(), text)
+    return list(keywords.values())
+
+
+def extract_audio_from_page(tree: lxml.html.HtmlElement, content: bytes) -> list[str]:
+    """Extract audio URLs from a page (audio elements + mp3 links in its raw HTML)."""
+    urls = {}  # insertion-ordered set
+    # Check <audio> elements and their <source>s
+    for src in AUDIO_SOURCES(tree):
+        urls.setdefault(str(src))
     # Also check raw HTML for mp3 links
-    html = str(soup)
-    mp3s = re.findall(r'https?://[^\"\s\'<>]+\.mp3', html)
-    urls.extend(mp3s)
-    return list(set(urls))
+    for url in AUDIO_LINK_RE.findall(content):
+        urls.setdefault(url.decode("utf-8", errors="replace"))
+    return list(urls)
 
 
 def get_session_titles_from_overview(unit_num: int) -> list[str]:
     """Get all 4 session titles from the unit overview page."""
     url = f"{BASE}/unit-{unit_num}"
-    soup = fetch(url)
-    if not soup:
+    tree = fetch(url)
+    if tree is None:
         return []
     titles = []
-    for h3 in soup.find_all("h3"):
-        text = h3.get_text(strip=True)
+    for h3 in tree.iter("h3"):
+        text = text_of(h3)
         if text and len(text) > 3 and len(text) < 100:
             titles.append(text)
     return titles[:4]
 
 
-def get_unit_title(soup: BeautifulSoup, unit_num: int) -> str:
+def get_unit_title(tree: lxml.html.HtmlElement, unit_num: int) -> str:
     """Extract unit title from page."""
-    span = soup.find("span", class_="bbcle-unit-title")
-    if span:
-        return f"Unit {unit_num}: {span.get_text(strip=True)}"
+    spans = UNIT_TITLE_SPAN(tree)
+    if spans:
+        return f"Unit {unit_num}: {text_of(spans[0])}"
     return f"Unit {unit_num}"
 
 
 def scrape_downloads(unit_num: int) -> dict:
     """Get audio and PDF links from the downloads page."""
     url = f"{DL_BASE}/unit-{unit_num}/downloads"
-    soup = fetch(url)
+    # Only regex-scanned, so the page is never parsed
+    html = fetch_text(url)
     result = {"mp3": [], "pdf": []}
-    if not soup:
+    if not html:
         return result
-    html = str(soup)
-    result["mp3"] = list(set(re.findall(r"https?://[^\"\s']+\.mp3", html)))
-    result["pdf"] = list(set(re.findall(r"https?://[^\"\s']+\.pdf", html)))
+    # One pass over the page for both file types
+    found = {"mp3": {}, "pdf": {}}
+    for m in DOWNLOAD_URL_RE.finditer(html):
+        found[m.group("ext")].setdefault(m.group(0))
+    result["mp3"] = list(found["mp3"])
+    result["pdf"] = list(found["pdf"])
     return result
 
 
@@ -163,44 +292,41 @@ def scrape_session(unit_num: int, session_num: int) -> dict:
     )
 
     transcript = None
+    transcript_bold = []
     content_blocks = []
-    session_audio = []
+    content_bold = []
+    session_audio = {}  # insertion-ordered set
+    unit_title = f"Unit {unit_num}"
 
     # Fetch activity pages (typically 1-3, sometimes more)
+    activity_prefix = f"{BASE}/unit-{unit_num}/session-{session_num}/activity-"
     for act in range(1, 8):
-        url = f"{BASE}/unit-{unit_num}/session-{session_num}/activity-{act}"
-        soup = fetch(url)
-        if not soup:
+        content = fetch_content(activity_prefix + str(act))
+        if content is None:
             break
+        tree = parse(content)
+
+        # The unit title is on every activity page, so read it off the first
+        if act == 1:
+            unit_title = get_unit_title(tree, unit_num)
 
         # Extract transcript (usually only on activity-1)
         if not transcript:
-            t = extract_transcript(soup)
-            if t:
-                transcript = t
+            transcript, transcript_bold = extract_transcript(tree)
 
         # Extract content blocks
-        blocks = extract_richtext_blocks(soup)
+        blocks, bold = extract_richtext_blocks(tree)
         content_blocks.extend(blocks)
+        content_bold.extend(bold)
 
         # Extract audio from individual activity pages
-        page_audio = extract_audio_from_page(soup)
-        session_audio.extend(page_audio)
-
-        time.sleep(0.5)
+        session_audio.update(dict.fromkeys(extract_audio_from_page(tree, content)))
 
     # Combine all content blocks
     combined_content = "\n\n".join(content_blocks) if content_blocks else None
 
-    # Extract keywords from all content
-    all_html = (transcript or "") + "\n" + (combined_content or "")
-    keywords = extract_keywords_from_html(all_html)
-    seen = set()
-    unique_keywords = []
-    for kw in keywords:
-        if kw.lower() not in seen:
-            seen.add(kw.lower())
-            unique_keywords.append(kw)
+    # Keywords come from the bold text collected off the same trees
+    keywords = extract_keywords(transcript_bold + content_bold)
 
     return {
         "id": session_num,
@@ -209,48 +335,41 @@ def scrape_session(unit_num: int, session_num: int) -> dict:
         "typeLabel": slabel,
         "transcript": transcript,
         "content": combined_content,
-        "keyWords": unique_keywords,
-        "_session_audio": list(set(session_audio)),  # temporary, for matching
+        "keyWords": keywords,
+        "_session_audio": list(session_audio),  # temporary, for matching
+        "_unit_title": unit_title,  # temporary, for the unit
     }
 
 
 def match_audio(unit_num: int, sessions: list, download_mp3s: list):
     """Match audio URLs to sessions intelligently."""
-    all_mp3s = list(set(download_mp3s))
+    all_mp3s = dict.fromkeys(download_mp3s)
 
     # Also collect audio found on individual session pages
     for s in sessions:
         for url in s.get("_session_audio", []):
-            if url not in all_mp3s:
-                all_mp3s.append(url)
+            all_mp3s.setdefault(url)
+    all_mp3s = list(all_mp3s)
 
     print(f"  All MP3s found: {len(all_mp3s)}")
     for url in all_mp3s:
         print(f"    {url.split('/')[-1]}")
 
-    # Categorize MP3s
-    vocab_mp3s = [u for u in all_mp3s if "vocab" in u.lower()]
-    gram_mp3s = [u for u in all_mp3s if "gram" in u.lower()]
-    other_mp3s = [u for u in all_mp3s if "vocab" not in u.lower() and "gram" not in u.lower()]
+    # Categorize MP3s in one pass, bucketed by the session type that uses them.
+    # Listening sessions take the "other" MP3s (not vocab/gram); session-page
+    # audio is already merged into all_mp3s above.
+    categorized = {"vocabulary": [], "grammar": [], "listening": []}
+    for u in all_mp3s:
+        lu = u.lower()
+        if "vocab" in lu:
+            categorized["vocabulary"].append(u)
+        elif "gram" in lu:
+            categorized["grammar"].append(u)
+        else:
+            categorized["listening"].append(u)
 
     for s in sessions:
-        audio_url = None
-        if s["type"] == "vocabulary":
-            audio_url = vocab_mp3s[0] if vocab_mp3s else None
-        elif s["type"] == "grammar":
-            audio_url = gram_mp3s[0] if gram_mp3s else None
-        elif s["type"] == "listening":
-            # For listening, use the "other" MP3s (not vocab/gram)
-            if other_mp3s:
-                audio_url = other_mp3s[0]
-            # Also check session-specific audio found on activity pages
-            elif s.get("_session_audio"):
-                for url in s["_session_audio"]:
-                    if "vocab" not in url.lower() and "gram" not in url.lower():
-                        audio_url = url
-                        break
-
-        s["audioUrl"] = audio_url
+        s["audioUrl"] = next(iter(categorized.get(s["type"], ())), None)
 
         # Clean up temp field
         if "_session_audio" in s:
@@ -263,23 +382,31 @@ def scrape_unit(unit_num: int) -> dict:
     print(f"Unit {unit_num}")
     print(f"{'='*60}")
 
-    print(f"  Fetching session titles...")
-    session_titles = get_session_titles_from_overview(unit_num)
-    print(f"  Session titles: {session_titles}")
+    # Every page of the unit is independent, so fetch them all in parallel
+    # and report in order as the results come in
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        titles_future = pool.submit(get_session_titles_from_overview, unit_num)
+        downloads_future = pool.submit(scrape_downloads, unit_num)
+        session_futures = [pool.submit(scrape_session, unit_num, s) for s in range(1, 5)]
 
-    print(f"  Fetching downloads...")
-    downloads = scrape_downloads(unit_num)
-    mp3_list = downloads["mp3"]
-    print(f"  Downloads: {len(mp3_list)} MP3, {len(downloads['pdf'])} PDF")
+        print(f"  Fetching session titles...")
+        session_titles = titles_future.result()
+        print(f"  Session titles: {session_titles}")
 
-    # Get unit title
-    soup = fetch(f"{BASE}/unit-{unit_num}/session-1/activity-1")
-    unit_title = get_unit_title(soup, unit_num) if soup else f"Unit {unit_num}"
+        print(f"  Fetching downloads...")
+        downloads = downloads_future.result()
+        mp3_list = downloads["mp3"]
+        print(f"  Downloads: {len(mp3_list)} MP3, {len(downloads['pdf'])} PDF")
 
-    sessions = []
-    for s in range(1, 5):
+        sessions = [future.result() for future in session_futures]
+
+    # Unit title from session 1's first activity page, already fetched above
+    unit_title = sessions[0]["_unit_title"]
+    for session in sessions:
+        del session["_unit_title"]
+
+    for s, session in enumerate(sessions, start=1):
         print(f"\n  Session {s}:")
-        session = scrape_session(unit_num, s)
 
         # Set session title from overview
         if s - 1 < len(session_titles):
@@ -294,9 +421,6 @@ def scrape_unit(unit_num: int) -> dict:
         print(f"    Transcript: {has_t}, Content: {has_c}, Keywords: {kw_count}")
         print(f"    Session page audio: {sa_count}")
 
-        sessions.append(session)
-        time.sleep(0.5)
-
     # Match audio to sessions
     print(f"\n  Matching audio...")
     match_audio(unit_num, sessions, mp3_list)
@@ -314,45 +438,86 @@ def scrape_unit(unit_num: int) -> dict:
     }
 
 
+def split_unit_html(unit_num: int, unit: dict) -> dict:
+    """
+    Write each session's transcript/content HTML to its own file and return a
+    copy of the unit with paths (relative to OUT_DIR) in their place.
+    """
+    sessions = []
+    for session in unit["sessions"]:
+        session = dict(session)
+        rel_dir = f"unit-{unit_num}/session-{session['id']}"
+        for field in ("transcript", "content"):
+            if session[field]:
+                (OUT_DIR / rel_dir).mkdir(parents=True, exist_ok=True)
+                (OUT_DIR / rel_dir / f"{field}.html").write_text(session[field], encoding="utf-8")
+                session[field] = f"{rel_dir}/{field}.html"
+        sessions.append(session)
+    return {**unit, "sessions": sessions}
+
+
 def main():
+    global FORCE_REFRESH, THROTTLE
+
+    parser = argparse.ArgumentParser(description="Clean BBC Learning English scraper")
+    parser.add_argument("--force-refresh", action="store_true",
+                        help="Refetch every page instead of using the disk cache")
+    parser.add_argument("--rate", type=float, default=REQUESTS_PER_SECOND,
+                        help="Maximum requests per second to the BBC site (default: %(default)s)")
+    args = parser.parse_args()
+    FORCE_REFRESH = args.force_refresh
+    THROTTLE = Throttle(args.rate)
+
     print("BBC Learning English - Clean Scraper v2")
     print("=" * 60)
-    print("Using requests + BeautifulSoup (no browser needed)")
+    print("Using requests + lxml (no browser needed)")
     print("With correct TYPE_MAP and activity page audio search")
     print()
 
-    all_units = {}
     total_transcripts = 0
     total_content = 0
     total_keywords = 0
     total_audio = 0
+    listening_status = []
 
-    for unit_num in range(1, 11):
-        unit = scrape_unit(unit_num)
-        all_units[unit_num] = unit
-
-        # Save individual unit file
-        out_file = OUT_DIR / f"unit-{unit_num}.json"
-        with open(out_file, "w", encoding="utf-8") as f:
-            json.dump(unit, f, ensure_ascii=False, indent=2)
-        print(f"\n  Saved: {out_file.name}")
-
-        # Stats
-        for s in unit["sessions"]:
-            if s["transcript"]:
-                total_transcripts += 1
-            if s["content"]:
-                total_content += 1
-            total_keywords += len(s["keyWords"])
-            if s.get("audioUrl"):
-                total_audio += 1
-
-        time.sleep(1)
-
-    # Save combined file for the app
+    # The combined file for the app keeps the HTML inline (js/app.js renders
+    # it straight from units.json). It is written unit by unit as each one is
+    # scraped (same layout as an indented dump of the whole dict),
+    # so only one unit is held in memory at a time. It is built under a
+    # temporary name so the app never sees a half-written file
     combined_file = OUT_DIR.parent / "units.json"
-    with open(combined_file, "w", encoding="utf-8") as f:
-        json.dump(all_units, f, ensure_ascii=False, indent=2)
+    partial_file = combined_file.with_suffix(".part")
+    with open(partial_file, "wb") as combined:
+        for unit_num in range(1, 11):
+            unit = scrape_unit(unit_num)
+            # UTF-8 bytes, non-ASCII kept as is (like ensure_ascii=False)
+            unit_json = orjson.dumps(unit, option=orjson.OPT_INDENT_2)
+
+            # Save individual unit file, with the HTML blobs kept out of the JSON
+            out_file = OUT_DIR / f"unit-{unit_num}.json"
+            lean_unit = split_unit_html(unit_num, unit)
+            out_file.write_bytes(orjson.dumps(lean_unit, option=orjson.OPT_INDENT_2))
+            print(f"\n  Saved: {out_file.name}")
+
+            separator = b"{\n" if unit_num == 1 else b",\n"
+            nested_json = unit_json.replace(b"\n", b"\n  ")
+            combined.write(separator + f'  "{unit_num}": '.encode() + nested_json)
+
+            # Stats
+            for s in unit["sessions"]:
+                if s["transcript"]:
+                    total_transcripts += 1
+                if s["content"]:
+                    total_content += 1
+                total_keywords += len(s["keyWords"])
+                if s.get("audioUrl"):
+                    total_audio += 1
+                if s["type"] == "listening":
+                    status = "OK" if s.get("audioUrl") else "MISSING"
+                    listening_status.append(f"    Unit {unit_num} S{s['id']} ({s['title']}): {status}")
+
+        combined.write(b"\n}")
+    partial_file.replace(combined_file)
 
     print("\n" + "=" * 60)
     print("SCRAPING COMPLETE!")
@@ -367,12 +532,12 @@ def main():
 
     # Report listening sessions without audio
     print("\n  Listening sessions audio status:")
-    for uid, unit in all_units.items():
-        for s in unit["sessions"]:
-            if s["type"] == "listening":
-                status = "OK" if s.get("audioUrl") else "MISSING"
-                print(f"    Unit {uid} S{s['id']} ({s['title']}): {status}")
+    for line in listening_status:
+        print(line)
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        SESSION.close()
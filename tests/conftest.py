@@ -0,0 +1,44 @@
+"""
+Shared fixtures: a temporary database built from schema/bbc_learning.sql,
+served through the FastAPI app
+"""
+import sqlite3
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.services.db_service import DatabaseService, get_db
+
+SCHEMA_PATH = Path(__file__).resolve().parent.parent / "schema" / "bbc_learning.sql"
+
+
+@pytest.fixture
+def db(tmp_path) -> DatabaseService:
+    """Empty course database with the runtime indexes and migrations applied"""
+    db_path = tmp_path / "bbc_learning.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA_PATH.read_text(encoding="utf-8"))
+    conn.close()
+
+    service = DatabaseService(str(db_path))
+    service.warm_up()
+    return service
+
+
+@pytest.fixture
+def sql(db):
+    """Direct connection for seeding and inspecting the test database"""
+    conn = sqlite3.connect(db.db_path, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def client(db):
+    """API client wired to the test database (lifespan is not run)"""
+    app.dependency_overrides[get_db] = lambda: db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
@@ -0,0 +1,50 @@
+"""
+Exercise answer endpoints
+"""
+import pytest
+
+
+@pytest.fixture
+def exercise_id(sql):
+    return sql.execute(
+        "INSERT INTO exercises (exercise_type, question, correct_answer, explanation) "
+        "VALUES ('multiple_choice', 'Pick one', 'B', 'Because B')"
+    ).lastrowid
+
+
+def test_bulk_submit_empty(client):
+    response = client.post("/api/exercises/submit", json={"answers": []})
+
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_bulk_submit_unknown_exercise(client):
+    response = client.post("/api/exercises/submit",
+                           json={"answers": [{"exercise_id": 999, "user_answer": "A"}]})
+
+    assert response.status_code == 200
+    assert response.json() == [{"exercise_id": 999, "error": "Exercise not found"}]
+
+
+def test_bulk_submit_grades_and_records(client, sql, exercise_id):
+    response = client.post("/api/exercises/submit", json={"answers": [
+        {"exercise_id": exercise_id, "user_answer": " b "},
+        {"exercise_id": exercise_id, "user_answer": "C"},
+    ]})
+
+    assert response.status_code == 200
+    assert [result["is_correct"] for result in response.json()] == [True, False]
+    assert response.json()[0]["correct_answer"] == "B"
+
+    attempts = sql.execute(
+        "SELECT user_answer, is_correct FROM exercise_attempts ORDER BY attempt_id"
+    ).fetchall()
+    assert [tuple(row) for row in attempts] == [(" b ", 1), ("C", 0)]
+
+
+def test_submit_unknown_exercise_is_404(client):
+    response = client.post("/api/exercises/999/submit", json={"user_answer": "A"})
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Exercise not found"
@@ -0,0 +1,33 @@
+"""
+Progress endpoints
+"""
+
+
+def test_mark_unknown_activity_complete(client, sql):
+    # foreign_keys is on, so progress for a missing activity is rejected
+    response = client.post("/api/progress/activities/999/complete")
+
+    assert response.status_code == 200
+    assert response.json() == {"success": False}
+    assert sql.execute("SELECT COUNT(*) FROM user_progress").fetchone()[0] == 0
+
+
+def test_mark_activity_complete(client, sql):
+    unit_id = sql.execute(
+        "INSERT INTO units (level_id, unit_number, title, url) VALUES ('intermediate', 1, 'Unit 1', 'u1')"
+    ).lastrowid
+    session_id = sql.execute(
+        "INSERT INTO sessions (unit_id, session_number, title, url) VALUES (?, 1, 'Session 1', 's1')",
+        (unit_id,)
+    ).lastrowid
+    activity_id = sql.execute(
+        "INSERT INTO activities (session_id, activity_number, url) VALUES (?, 1, 'a1')",
+        (session_id,)
+    ).lastrowid
+
+    for _ in range(2):
+        response = client.post(f"/api/progress/activities/{activity_id}/complete")
+        assert response.json() == {"success": True}
+
+    row = sql.execute("SELECT completed FROM user_progress WHERE activity_id = ?", (activity_id,)).fetchone()
+    assert row["completed"] == 1
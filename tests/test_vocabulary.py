@@ -0,0 +1,79 @@
+"""
+Flashcard review endpoints
+"""
+import time
+
+import pytest
+
+
+@pytest.fixture
+def card_id(sql):
+    return sql.execute(
+        "INSERT INTO flashcards (word, definition_en, difficulty) VALUES ('ramble', 'walk', 'easy')"
+    ).lastrowid
+
+
+def test_bulk_review_empty(client):
+    response = client.post("/api/vocabulary/flashcards/review", json={"reviews": []})
+
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_bulk_review_unknown_card(client):
+    response = client.post("/api/vocabulary/flashcards/review",
+                           json={"reviews": [{"card_id": 999, "quality": 4}]})
+
+    assert response.status_code == 200
+    assert response.json() == [{"card_id": 999, "error": "Flashcard not found"}]
+
+
+def test_bulk_review_rejects_bad_quality(client, card_id):
+    response = client.post("/api/vocabulary/flashcards/review",
+                           json={"reviews": [{"card_id": card_id, "quality": 6}]})
+
+    assert response.status_code == 400
+
+
+def test_bulk_review_applies_sm2_in_order(client, sql, card_id):
+    response = client.post("/api/vocabulary/flashcards/review", json={"reviews": [
+        {"card_id": card_id, "quality": 5},
+        {"card_id": card_id, "quality": 5},
+    ]})
+
+    assert response.status_code == 200
+    first, second = response.json()
+    assert (first["repetitions"], first["interval"]) == (1, 1)
+    assert (second["repetitions"], second["interval"]) == (2, 6)
+    assert second["easiness_factor"] == pytest.approx(2.7)
+
+    row = sql.execute("SELECT * FROM flashcard_progress WHERE card_id = ?", (card_id,)).fetchone()
+    assert (row["repetitions"], row["interval"]) == (2, 6)
+    assert row["easiness_factor"] == pytest.approx(2.7)
+    assert row["next_review_date"] == second["next_review_date"]
+    assert isinstance(row["last_reviewed_at"], int)
+
+
+def test_review_unknown_card_is_404(client):
+    response = client.post("/api/vocabulary/flashcards/999/review", json={"quality": 3})
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Flashcard not found"
+
+
+def test_review_resets_on_failed_recall(client, card_id):
+    response = client.post(f"/api/vocabulary/flashcards/{card_id}/review", json={"quality": 1})
+
+    assert response.status_code == 200
+    assert (response.json()["repetitions"], response.json()["interval"]) == (0, 1)
+
+
+def test_due_count(client, sql, card_id):
+    assert client.get("/api/vocabulary/flashcards/due/count").json() == {"due": 0}
+
+    sql.execute(
+        "INSERT INTO flashcard_progress (card_id, next_review_date) VALUES (?, ?)",
+        (card_id, int(time.time()) - 60)
+    )
+
+    assert client.get("/api/vocabulary/flashcards/due/count").json() == {"due": 1}